@@ -0,0 +1,164 @@
+"""
+Benchmark de la publication d'un cours contre le faux backend Telegram (aucun accès réseau) :
+
+    python -m benchmarks.bench_publish
+    python -m benchmarks.bench_publish --lessons 200 --latency 0.1 --flood-every 40
+    python -m benchmarks.bench_publish --lessons 100 --audio-ratio 0 --albums
+    python -m benchmarks.bench_publish --json > base.json
+    python -m benchmarks.bench_publish --baseline base.json --tolerance 0.15
+
+Compare l'envoi séquentiel historique (une leçon après l'autre, upload compris dans
+send_file) au moteur de publication en pipeline pour plusieurs niveaux de concurrence.
+Avec --baseline, le code de sortie vaut 1 si un scénario est plus lent que la référence
+au-delà de la tolérance.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+# Sessions, journaux et caches du benchmark dans un dossier jetable (avant d'importer publisher)
+BENCH_HOME = tempfile.mkdtemp(prefix="publisher_bench_")
+os.environ["HOME"] = BENCH_HOME
+
+from publisher import build_publish_job, publish_course, RateScheduler, ScheduledClient, CourseIndex  # noqa: E402
+
+from .fake_telegram import FakeNetwork, FakeTelegramClient  # noqa: E402
+from .synthetic import make_course  # noqa: E402
+
+class QuietLogger:
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.lines = 0
+
+    def log(self, text):
+        self.lines += 1
+        if self.verbose:
+            print(text, file=sys.stderr)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_publish", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--lessons", type=int, default=40)
+    parser.add_argument("--image-kb", type=int, default=300)
+    parser.add_argument("--audio-kb", type=int, default=2048)
+    parser.add_argument("--audio-ratio", type=float, default=0.7, help="proportion de leçons avec audio")
+    parser.add_argument("--latency", type=float, default=0.05, help="aller-retour simulé (s)")
+    parser.add_argument("--bandwidth-mb", type=float, default=20.0, help="débit montant simulé (Mo/s)")
+    parser.add_argument("--flood-every", type=int, default=0, help="FloodWait tous les N appels d'une méthode")
+    parser.add_argument("--flood-seconds", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--albums", action="store_true", help="mode album pour les leçons sans audio")
+    parser.add_argument("--no-sequential", action="store_true", help="ne pas mesurer l'envoi séquentiel")
+    parser.add_argument("--real-limits", action="store_true",
+                        help="appliquer les RATE_LIMITS réels (sinon seul le réseau simulé limite le débit)")
+    parser.add_argument("--json", action="store_true", help="résultats en JSON sur stdout")
+    parser.add_argument("--baseline", help="résultats JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="baisse de débit tolérée (0.2 = 20 %%)")
+    parser.add_argument("--verbose", action="store_true", help="afficher le journal de publication")
+    return parser
+
+def make_network(args):
+    return FakeNetwork(latency=args.latency, bandwidth=args.bandwidth_mb * 1024 * 1024,
+                       flood_every=args.flood_every, flood_seconds=args.flood_seconds)
+
+def make_scheduler(args, logger):
+    if args.real_limits:
+        return RateScheduler(logger)
+    return RateScheduler(logger, limits={k: 1000.0 for k in ("upload", "send", "channel", "resolve", "read", "default")})
+
+async def run_sequential(args, job, logger):
+    """Chemin historique : pour chaque leçon, send_file de l'image puis de l'audio (upload inclus)."""
+    network = make_network(args)
+    client = ScheduledClient(FakeTelegramClient(network), make_scheduler(args, logger))
+    entity = client.client.add_channel(job["channel_title"])
+    lessons = CourseIndex.get(job["book_path"]).lessons
+    started = time.perf_counter()
+    for lesson in lessons:
+        await client.send_file(entity, lesson["img_path"], caption=f"{job['hashtag']} {lesson['base_name']}")
+        if lesson["audio_path"]:
+            await client.send_file(entity, lesson["audio_path"])
+    return time.perf_counter() - started, network
+
+async def run_pipeline(args, job, logger, concurrency, name):
+    network = make_network(args)
+    client = FakeTelegramClient(network)
+    started = time.perf_counter()
+    await publish_course(client, job, logger, name, concurrency, scheduler=make_scheduler(args, logger))
+    return time.perf_counter() - started, network
+
+def summarize(name, seconds, network, lessons, total_bytes):
+    return {
+        "scenario": name,
+        "seconds": round(seconds, 3),
+        "lessons_per_min": round(lessons * 60 / seconds, 2) if seconds else 0.0,
+        "mb_per_s": round(total_bytes / (1024 * 1024) / seconds, 2) if seconds else 0.0,
+        "rpc_calls": sum(network.calls.values()),
+        "flood_waits": network.floods,
+    }
+
+async def run(args):
+    logger = QuietLogger(args.verbose)
+    books_dir = os.path.join(BENCH_HOME, "books")
+    make_course(books_dir, "Bench", args.lessons, args.image_kb * 1024, args.audio_kb * 1024, args.audio_ratio)
+    index = CourseIndex.get(os.path.join(books_dir, "Bench"))
+    results = []
+
+    def job():
+        return build_publish_job(books_dir, "Bench", "#dars", main_channel_id="", logger=logger, albums=args.albums)
+
+    if not args.no_sequential:
+        seconds, network = await run_sequential(args, job(), logger)
+        results.append(summarize("sequential", seconds, network, len(index.lessons), index.total_bytes))
+    for concurrency in args.concurrency:
+        # Nom de compte distinct par scénario : journal et cache des médias vierges
+        name = f"pipeline_c{concurrency}"
+        seconds, network = await run_pipeline(args, job(), logger, concurrency, name)
+        results.append(summarize(name, seconds, network, len(index.lessons), index.total_bytes))
+    return {
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "baseline", "verbose")},
+        "lessons": len(index.lessons),
+        "bytes": index.total_bytes,
+        "results": results,
+    }
+
+def compare(report, baseline, tolerance):
+    """Scénarios dont le débit (leçons/min) a baissé au-delà de la tolérance."""
+    reference = {r["scenario"]: r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        ref = reference.get(result["scenario"])
+        if ref and result["lessons_per_min"] < ref["lessons_per_min"] * (1 - tolerance):
+            regressions.append((result["scenario"], ref["lessons_per_min"], result["lessons_per_min"]))
+    return regressions
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        shutil.rmtree(BENCH_HOME, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['lessons']} leçons, {report['bytes'] / (1024 * 1024):.1f} Mo — "
+              f"latence {args.latency * 1000:.0f} ms, {args.bandwidth_mb:.0f} Mo/s")
+        print(f"{'scénario':<14}{'secondes':>10}{'leçons/min':>12}{'Mo/s':>8}{'appels':>8}{'FloodWait':>11}")
+        for r in report["results"]:
+            print(f"{r['scenario']:<14}{r['seconds']:>10.2f}{r['lessons_per_min']:>12.1f}"
+                  f"{r['mb_per_s']:>8.2f}{r['rpc_calls']:>8}{r['flood_waits']:>11}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for scenario, before, after in regressions:
+            print(f"❌ Régression {scenario} : {before} → {after} leçons/min", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Benchmark du démarrage à froid : temps d'import de chaque point d'entrée, mesuré dans
+un interpréteur neuf à chaque essai (médiane de plusieurs essais) :
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --json > startup.json
+    python -m benchmarks.bench_startup --baseline startup.json --tolerance 0.3
+
+Vérifie aussi que les modules lourds (Telethon, QtMultimedia) ne sont chargés que par
+les points d'entrée qui en ont besoin. Code de sortie 1 si un module lourd est chargé
+trop tôt, ou, avec --baseline, si un import est plus lent que la référence au-delà
+de la tolérance.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# scénario -> (instruction importée, modules lourds interdits pour ce scénario)
+SCENARIOS = {
+    "core": ("from publisher import list_books, CourseIndex, build_publish_job, JobQueue", ("telethon", "PyQt5")),
+    "planner": ("from publisher import build_plan, format_plan", ("telethon", "PyQt5")),
+    "cli": ("import publisher.cli", ("telethon", "PyQt5")),
+    "pipeline": ("from publisher import publish_course", ("PyQt5",)),
+    "app": ("import app", ("telethon", "PyQt5")),
+    "gui": ("import gui", ("telethon", "PyQt5.QtMultimedia")),
+}
+HEAVY = ("telethon", "PyQt5", "PyQt5.QtMultimedia")
+
+CHILD = """
+import sys, time, json
+started = time.perf_counter()
+try:
+    exec({statement!r})
+    error = None
+except ImportError as e:
+    error = str(e)
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "error": error, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_startup", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="essais par scénario (interpréteur neuf à chaque fois)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="scénario à mesurer (répétable)")
+    parser.add_argument("--json", action="store_true", help="résultats en JSON sur stdout")
+    parser.add_argument("--baseline", help="résultats JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="hausse du temps d'import tolérée (0.3 = 30 %%)")
+    return parser
+
+def measure(name, runs):
+    statement, forbidden = SCENARIOS[name]
+    code = CHILD.format(statement=statement, heavy=HEAVY)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        sample = json.loads(out.stdout.strip().splitlines()[-1])
+        if sample["error"]:
+            # Dépendance absente (ex. PyQt5 sur un serveur) : scénario ignoré
+            return {"scenario": name, "skipped": sample["error"]}
+        samples.append(sample)
+    loaded = samples[-1]["loaded"]
+    return {
+        "scenario": name,
+        "seconds": round(statistics.median(s["seconds"] for s in samples), 4),
+        "min_seconds": round(min(s["seconds"] for s in samples), 4),
+        "loaded": loaded,
+        "too_early": [m for m in loaded if m in forbidden],
+    }
+
+def compare(report, baseline, tolerance):
+    """Scénarios dont le temps d'import a augmenté au-delà de la tolérance."""
+    reference = {r["scenario"]: r for r in baseline["results"] if "seconds" in r}
+    regressions = []
+    for result in report["results"]:
+        ref = reference.get(result["scenario"])
+        if ref and "seconds" in result and result["seconds"] > ref["seconds"] * (1 + tolerance):
+            regressions.append((result["scenario"], ref["seconds"], result["seconds"]))
+    return regressions
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "results": [measure(name, args.runs) for name in (args.scenario or SCENARIOS)],
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'scénario':<10}{'médiane (ms)':>14}{'min (ms)':>10}  modules lourds chargés")
+        for r in report["results"]:
+            if "skipped" in r:
+                print(f"{r['scenario']:<10}{'ignoré':>14}{'':>10}  ({r['skipped']})")
+                continue
+            print(f"{r['scenario']:<10}{r['seconds'] * 1000:>14.1f}{r['min_seconds'] * 1000:>10.1f}  "
+                  f"{', '.join(r['loaded']) or '-'}")
+
+    status = 0
+    for r in report["results"]:
+        if r.get("too_early"):
+            print(f"❌ {r['scenario']} charge {', '.join(r['too_early'])} dès l'import", file=sys.stderr)
+            status = 1
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for scenario, before, after in regressions:
+            print(f"❌ Régression {scenario} : {before * 1000:.1f} → {after * 1000:.1f} ms", file=sys.stderr)
+        if regressions:
+            status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
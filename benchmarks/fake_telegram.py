@@ -0,0 +1,229 @@
+"""
+Faux backend Telegram en mémoire pour les benchmarks : remplace TelegramClient
+(mêmes méthodes que celles utilisées par publisher/) avec une latence, une bande
+passante et des FloodWait simulés, sans aucun accès réseau.
+"""
+import os
+import random
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+from telethon.errors import FloodWaitError
+
+from publisher.menus import visible_text
+
+class FakeNetwork:
+    """
+    Paramètres du réseau simulé.
+    - latency : aller-retour d'un appel (secondes)
+    - bandwidth : débit montant total partagé par tous les envois (octets / seconde)
+    - chunk_size : taille des morceaux d'upload (un aller-retour par morceau, comme MTProto)
+    - flood_every : un FloodWait tous les N appels d'une même méthode (0 = jamais)
+    - flood_seconds : durée des FloodWait injectés
+    """
+
+    def __init__(self, latency=0.05, bandwidth=5 * 1024 * 1024, chunk_size=512 * 1024,
+                 flood_every=0, flood_seconds=1, seed=0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.chunk_size = chunk_size
+        self.flood_every = flood_every
+        self.flood_seconds = flood_seconds
+        self.random = random.Random(seed)
+        self.link = asyncio.Lock()  # la bande passante est partagée : un morceau à la fois sur le lien
+        self.calls = {}
+        self.floods = 0
+        self.bytes = 0
+
+    async def rpc(self, method):
+        """Un appel : latence (avec un peu de gigue) et FloodWait injecté si configuré."""
+        count = self.calls[method] = self.calls.get(method, 0) + 1
+        await asyncio.sleep(self.latency * self.random.uniform(0.8, 1.2))
+        if self.flood_every and count % self.flood_every == 0:
+            self.floods += 1
+            raise FloodWaitError(request=None, capture=self.flood_seconds)
+
+    async def transfer(self, size):
+        """Envoi de `size` octets par morceaux : latence par morceau, débit partagé sur le lien."""
+        for offset in range(0, max(size, 1), self.chunk_size):
+            chunk = min(self.chunk_size, size - offset)
+            async with self.link:
+                await asyncio.sleep(chunk / self.bandwidth)
+            await asyncio.sleep(self.latency)
+            self.bytes += chunk
+
+class FakeTelegramClient:
+    """Client Telegram simulé : canaux et messages gardés en mémoire."""
+
+    def __init__(self, network=None):
+        self.network = network or FakeNetwork()
+        self.flood_sleep_threshold = 60
+        self._connected = False
+        self._ids = itertools.count(1)
+        self._media_ids = itertools.count(1000)
+        self.channels = {}  # titre ou username -> canal
+        self.messages = {}  # (canal, id) -> message
+
+    # --- Connexion
+    async def connect(self):
+        await self.network.rpc("connect")
+        self._connected = True
+
+    async def disconnect(self):
+        self._connected = False
+
+    def is_connected(self):
+        return self._connected
+
+    async def is_user_authorized(self):
+        return True
+
+    async def get_me(self):
+        await self.network.rpc("get_me")
+        return SimpleNamespace(id=1, username="bench")
+
+    # --- Entités
+    def _channel(self, title, username=None):
+        channel = SimpleNamespace(id=len(self.channels) + 100, access_hash=7, title=title, username=username)
+        self.channels[title] = channel
+        if username:
+            self.channels[username] = channel
+        return channel
+
+    def add_channel(self, title, username=None):
+        """Canal existant avant la publication (ex. canal de menu principal)."""
+        return self._channel(title, username)
+
+    async def get_entity(self, key):
+        await self.network.rpc("get_entity")
+        if hasattr(key, "channel_id"):
+            key = next((c for c in self.channels.values() if c.id == key.channel_id), None)
+            if key is None:
+                raise ValueError("Canal inconnu")
+            return key
+        if key not in self.channels:
+            raise ValueError(f"Aucune entité ne correspond à {key!r}")
+        return self.channels[key]
+
+    async def get_input_entity(self, key):
+        return await self.get_entity(key)
+
+    async def __call__(self, request, *args, **kwargs):
+        name = type(request).__name__
+        await self.network.rpc(name)
+        if name == "CreateChannelRequest":
+            return SimpleNamespace(chats=[self._channel(request.title)])
+        if name == "GetFullChannelRequest":
+            channel = request.channel
+            return SimpleNamespace(chats=[SimpleNamespace(username=getattr(channel, "username", None))])
+        if name == "UploadMediaRequest":
+            # Fichier envoyé -> photo Telegram réutilisable (préalable à un album)
+            return SimpleNamespace(photo=SimpleNamespace(id=next(self._media_ids), access_hash=1,
+                                                         file_reference=b"ref"))
+        if name in ("SaveBigFilePartRequest", "SaveFilePartRequest"):
+            # Morceau d'un envoi par ParallelUploader
+            await self.network.transfer(len(request.bytes))
+            return True
+        return SimpleNamespace(chats=[])
+
+    # --- Fichiers et messages
+    async def upload_file(self, file, **kwargs):
+        size = os.path.getsize(file) if isinstance(file, str) else len(file)
+        await self.network.rpc("upload_file")
+        await self.network.transfer(size)
+        return SimpleNamespace(name=os.path.basename(file) if isinstance(file, str) else "file", size=size)
+
+    @staticmethod
+    def _chat_id(entity):
+        # Canal complet (id) ou InputPeerChannel du cache des entités (channel_id)
+        return getattr(entity, "id", getattr(entity, "channel_id", entity))
+
+    def _message(self, entity, text="", media=None, kind=None):
+        msg = SimpleNamespace(
+            id=next(self._ids), chat_id=self._chat_id(entity),
+            message=text, photo=None, document=None,
+        )
+        if media is not None:
+            media = SimpleNamespace(id=next(self._media_ids), access_hash=1, file_reference=b"ref")
+            if kind == "photo":
+                msg.photo = media
+            else:
+                msg.document = media
+        self.messages[(msg.chat_id, msg.id)] = msg
+        return msg
+
+    async def _media(self, file):
+        # Chemin : upload implicite comme Telethon ; sinon fichier déjà envoyé ou référence
+        if isinstance(file, str):
+            await self.upload_file(file)
+            name = file
+        else:
+            name = getattr(file, "name", "") or ""
+        return "photo" if name.lower().endswith((".jpg", ".png")) or not name else "document"
+
+    async def send_file(self, entity, file, caption=None, **kwargs):
+        if isinstance(file, list):
+            kinds = []
+            for f in file:
+                kinds.append(await self._media(f))
+                if not hasattr(f, "file_reference"):
+                    # Comme Telethon (_send_album) : chaque fichier envoyé est d'abord converti
+                    # en média par un appel messages.uploadMedia, puis l'album part en un appel
+                    await self.network.rpc("UploadMediaRequest")
+            await self.network.rpc("send_file")
+            captions = caption if isinstance(caption, list) else [caption] * len(file)
+            return [self._message(entity, c or "", True, k) for c, k in zip(captions, kinds)]
+        kind = await self._media(file)
+        await self.network.rpc("send_file")
+        return self._message(entity, caption or "", True, kind)
+
+    async def send_message(self, entity, text, **kwargs):
+        await self.network.rpc("send_message")
+        # Comme Telegram : le HTML devient du texte brut (les liens passent en entités)
+        return self._message(entity, visible_text(text))
+
+    async def edit_message(self, entity, message, text=None, **kwargs):
+        await self.network.rpc("edit_message")
+        msg_id = getattr(message, "id", message)
+        stored = self.messages.get((self._chat_id(entity), msg_id))
+        if stored is not None and text is not None:
+            stored.message = visible_text(text)
+        return SimpleNamespace(id=msg_id, message=text)
+
+    async def pin_message(self, entity, message, **kwargs):
+        await self.network.rpc("pin_message")
+
+    async def delete_messages(self, entity, ids, **kwargs):
+        await self.network.rpc("delete_messages")
+        chat_id = self._chat_id(entity)
+        for msg_id in ids if isinstance(ids, (list, tuple)) else [ids]:
+            self.messages.pop((chat_id, getattr(msg_id, "id", msg_id)), None)
+
+    async def forward_messages(self, entity, messages, from_peer=None, **kwargs):
+        await self.network.rpc("forward_messages")
+        source_id = self._chat_id(from_peer)
+        copies = []
+        for message in messages:
+            original = self.messages.get((source_id, getattr(message, "id", message)))
+            if original is None:
+                copies.append(None)
+                continue
+            copy = self._message(entity, original.message)
+            copy.photo, copy.document = original.photo, original.document
+            copies.append(copy)
+        return copies
+
+    async def get_messages(self, entity, ids=None, limit=None, offset_id=0, reverse=False, **kwargs):
+        await self.network.rpc("get_messages")
+        chat_id = self._chat_id(entity)
+        if isinstance(ids, list):
+            return [self.messages.get((chat_id, i)) for i in ids]
+        if ids is not None:
+            return self.messages.get((chat_id, ids))
+        # Historique : plus anciens d'abord avec reverse=True (id > offset_id)
+        history = sorted((m for (c, _), m in self.messages.items() if c == chat_id), key=lambda m: m.id,
+                         reverse=not reverse)
+        if offset_id:
+            history = [m for m in history if (m.id > offset_id if reverse else m.id < offset_id)]
+        return history[:limit or 1]
@@ -0,0 +1,40 @@
+"""
+Cours synthétiques pour les benchmarks : même arborescence qu'un vrai cours
+(images/, audios/, config/config.json), fichiers de contenu aléatoire.
+"""
+import os
+import json
+import random
+
+def make_course(books_dir, name, lessons=50, image_size=300 * 1024, audio_size=3 * 1024 * 1024,
+                audio_ratio=1.0, size_jitter=0.2, seed=0):
+    """
+    Crée le cours `name` dans books_dir : `lessons` images (001.jpg, 002.jpg...) dont une
+    proportion `audio_ratio` a un audio du même nom. Les tailles varient de ±size_jitter.
+    Retourne le chemin du cours.
+    """
+    rng = random.Random(seed)
+    book_path = os.path.join(books_dir, name)
+    for sub in ("images", "audios", "config"):
+        os.makedirs(os.path.join(book_path, sub), exist_ok=True)
+    with open(os.path.join(book_path, "config", "config.json"), "w", encoding="utf-8") as f:
+        json.dump({"nomArabe": "درس تجريبي", "nomLatin": name}, f, ensure_ascii=False)
+
+    def write(path, size):
+        size = max(1, int(size * rng.uniform(1 - size_jitter, 1 + size_jitter)))
+        with open(path, "wb") as f:
+            f.write(rng.randbytes(size))
+
+    for i in range(1, lessons + 1):
+        write(os.path.join(book_path, "images", f"{i:03}.jpg"), image_size)
+        if rng.random() < audio_ratio:
+            write(os.path.join(book_path, "audios", f"{i:03}.mp3"), audio_size)
+    return book_path
+
+def make_catalogue(books_dir, courses=3, lessons=(20, 80), seed=0, **kwargs):
+    """Plusieurs cours de tailles variées (nombre de leçons tiré dans l'intervalle `lessons`)."""
+    rng = random.Random(seed)
+    return [
+        make_course(books_dir, f"Cours{i + 1:02}", rng.randint(*lessons), seed=seed + i, **kwargs)
+        for i in range(courses)
+    ]
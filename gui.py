@@ -0,0 +1,852 @@
+"""
+Interface graphique PyQt, lancée par `python app.py` (sans argument).
+"""
+import os
+import sys
+
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QComboBox, QFileDialog, QLineEdit, QMessageBox, QTextEdit, QSlider, QSpinBox, QCheckBox,
+    QTableWidget, QTableWidgetItem, QProgressBar, QAbstractItemView
+)
+from PyQt5.QtCore import Qt, QUrl, QTimer, pyqtSignal, QObject, QRunnable, QThreadPool, QSize
+from PyQt5.QtGui import QPixmap, QImage, QImageReader
+from PyQt5.QtWidgets import QInputDialog
+
+import builtins
+import traceback
+import re
+import hashlib
+from collections import OrderedDict, deque
+
+# Modules de publication (Telethon) et QtMultimedia chargés au premier usage, pas au démarrage
+from publisher import (
+    UPLOAD_CONCURRENCY, QUEUE_CHANNELS, load_api_keys, save_api_keys, list_books, build_channel_title,
+    build_publish_job, CourseIndex, ClientService, JsonlLogSink, JobQueue
+)
+
+# === Miniatures de l'aperçu ===
+THUMB_HEIGHT = 300
+THUMB_CACHE_SIZE = 64      # miniatures gardées en mémoire (LRU)
+THUMB_PREFETCH = 3         # leçons préchargées avant et après la leçon affichée
+THUMB_DISK_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "telegram_course_publisher", "thumbnails")
+
+# === Journal de l'interface ===
+LOG_FLUSH_INTERVAL_MS = 100   # ajout des lignes en attente au widget, par lots
+LOG_MAX_LINES = 5000          # lignes gardées dans le widget
+
+# === Panneau de la file de publication ===
+QUEUE_REFRESH_INTERVAL_MS = 1000
+QUEUE_STATES = {"pending": "⏳ En attente", "running": "🚀 En cours", "done": "✅ Terminé", "failed": "❌ Échec"}
+
+def handle_exception(exc_type, exc_value, exc_traceback):
+    if issubclass(exc_type, KeyboardInterrupt):
+        sys.__excepthook__(exc_type, exc_value, exc_traceback)
+        return
+    print("❌ Exception non interceptée :", exc_value)
+    traceback.print_tb(exc_traceback)
+
+sys.excepthook = handle_exception
+
+# === Classe pour la gestion des logs ===
+class Logger(QObject):
+    """
+    Les lignes arrivent de n'importe quel thread (service Telegram, pool...) et sont
+    mises en attente ; une minuterie les ajoute au widget par lots, qui ne garde que
+    les LOG_MAX_LINES dernières. Chaque ligne est aussi écrite en JSONL sur disque.
+    """
+
+    def __init__(self, log_widget, sink=None):
+        super().__init__()
+        self.log_widget = log_widget
+        self.log_widget.document().setMaximumBlockCount(LOG_MAX_LINES)
+        self.sink = sink
+        self.pending = deque(maxlen=LOG_MAX_LINES)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(LOG_FLUSH_INTERVAL_MS)
+
+    def log(self, text, source="app"):
+        text = str(text)
+        if self.sink:
+            self.sink.write(text, source)
+        self.pending.append(text)
+
+    def flush(self):
+        batch = []
+        while self.pending:
+            try:
+                batch.append(self.pending.popleft())
+            except IndexError:
+                break
+        if self.sink:
+            self.sink.flush()
+        if batch:
+            self.log_widget.append("\n".join(batch))
+
+    def close(self):
+        self.timer.stop()
+        self.flush()
+        if self.sink:
+            self.sink.close()
+
+# === Décodage des miniatures hors du thread de l'interface ===
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+
+class ThumbnailTask(QRunnable):
+    def __init__(self, path, height, disk_dir, signals):
+        super().__init__()
+        self.path = path
+        self.height = height
+        self.disk_dir = disk_dir
+        self.signals = signals
+
+    def disk_path(self):
+        st = os.stat(self.path)
+        key = f"{os.path.abspath(self.path)}|{st.st_size}|{st.st_mtime_ns}|{self.height}"
+        return os.path.join(self.disk_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg")
+
+    def run(self):
+        image = QImage()
+        cached = None
+        try:
+            if self.disk_dir:
+                cached = self.disk_path()
+                if os.path.exists(cached):
+                    image = QImage(cached)
+            if image.isNull():
+                # Décodage directement à la taille voulue (bien plus rapide pour les gros JPEG)
+                reader = QImageReader(self.path)
+                reader.setAutoTransform(True)
+                size = reader.size()
+                if size.isValid() and size.height() > self.height:
+                    reader.setScaledSize(size.scaled(QSize(size.width(), self.height), Qt.KeepAspectRatio))
+                image = reader.read()
+                if not image.isNull() and image.height() != self.height:
+                    image = image.scaledToHeight(self.height, Qt.SmoothTransformation)
+                if cached and not image.isNull():
+                    os.makedirs(self.disk_dir, exist_ok=True)
+                    image.save(cached, "JPG", 90)
+        except OSError:
+            pass
+        self.signals.loaded.emit(self.path, image)
+
+class ThumbnailLoader(QObject):
+    """
+    Miniatures de l'aperçu décodées dans un pool de threads, gardées dans un cache LRU
+    borné et, en option, sur disque : la navigation dans un cours déjà visité est immédiate.
+    """
+    ready = pyqtSignal(str)
+
+    def __init__(self, height=THUMB_HEIGHT, capacity=THUMB_CACHE_SIZE, disk_dir=THUMB_DISK_CACHE):
+        super().__init__()
+        self.height = height
+        self.capacity = capacity
+        self.disk_dir = disk_dir
+        self.cache = OrderedDict()  # chemin -> QPixmap
+        self.pending = set()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(2)
+        self.signals = ThumbnailSignals()
+        self.signals.loaded.connect(self._on_loaded)
+
+    def get(self, path):
+        pixmap = self.cache.get(path)
+        if pixmap is not None:
+            self.cache.move_to_end(path)
+        return pixmap
+
+    def request(self, path):
+        if path in self.cache or path in self.pending:
+            return
+        self.pending.add(path)
+        self.pool.start(ThumbnailTask(path, self.height, self.disk_dir, self.signals))
+
+    def _on_loaded(self, path, image):
+        self.pending.discard(path)
+        if image.isNull():
+            return
+        # QPixmap ne peut être créé que dans le thread de l'interface
+        self.cache[path] = QPixmap.fromImage(image)
+        self.cache.move_to_end(path)
+        while len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+        self.ready.emit(path)
+
+# === Totaux audio d'un cours (durée, débit) calculés hors du thread de l'interface ===
+class AudioTotalsSignals(QObject):
+    done = pyqtSignal(str, object)
+
+class AudioTotalsTask(QRunnable):
+    def __init__(self, book, paths, index, signals):
+        super().__init__()
+        self.book = book
+        self.paths = paths
+        self.index = index
+        self.signals = signals
+
+    def run(self):
+        # Déjà en cache : immédiat ; sinon analyse dans le pool de processus de l'index
+        try:
+            summary = self.index.summary(self.index.build(self.paths))
+        except Exception:
+            summary = None
+        self.signals.done.emit(self.book, summary)
+
+class BookUploader(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Telegram Course Publisher")
+        self.resize(1200, 700)
+        self.api_keys = load_api_keys()
+        self.books_dir = ""
+        self.books = []
+        self.current_book = None
+        self.current_index = 0
+        self.log_output = QTextEdit()
+        self.log_output.setReadOnly(True)
+        self.log_output.setStyleSheet("background-color: black; color: lime; font-family: monospace;")
+        self.logger = Logger(self.log_output, JsonlLogSink.for_session("gui"))
+        self.thumbnails = ThumbnailLoader()
+        self.thumbnails.ready.connect(self.on_thumbnail_ready)
+        self.displayed_image = None
+        self._player = None  # lecteur audio, créé au premier aperçu
+        # Index des métadonnées audio (créé au premier cours affiché)
+        self.audio_index = None
+        self.audio_pool = QThreadPool()
+        self.audio_pool.setMaxThreadCount(1)
+        self.audio_signals = AudioTotalsSignals()
+        self.audio_signals.done.connect(self.on_audio_totals)
+        # Boucle asyncio et clients Telegram persistants (démarrés au premier envoi)
+        self.client_service = ClientService(self.logger)
+        # File de publication persistante (reprise au redémarrage)
+        self.job_queue = JobQueue()
+        self.queue_future = None
+        self.catalogue_future = None
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        main_layout = QHBoxLayout()
+        left_layout = QVBoxLayout()
+
+        # Ligne API Key
+        api_layout = QHBoxLayout()
+        self.api_selector = QComboBox()
+        self.refresh_api_selector()
+        self.api_selector.currentIndexChanged.connect(self.select_api_key)
+        api_layout.addWidget(QLabel("Identifiants API :"))
+        api_layout.addWidget(self.api_selector)
+        self.add_api_button = QPushButton("Ajouter une clé API")
+        self.add_api_button.clicked.connect(self.add_api_key)
+        api_layout.addWidget(self.add_api_button)
+        left_layout.addLayout(api_layout)
+
+        # Sélecteur de dossier de livres
+        folder_layout = QHBoxLayout()
+        self.folder_input = QLineEdit()
+        self.folder_input.setPlaceholderText("Sélectionner le dossier contenant les livres...")
+        self.folder_button = QPushButton("Parcourir")
+        self.folder_button.clicked.connect(self.select_books_folder)
+        folder_layout.addWidget(self.folder_input)
+        folder_layout.addWidget(self.folder_button)
+        left_layout.addLayout(folder_layout)
+
+        # Sélecteur de livre + nom canal
+        book_layout = QHBoxLayout()
+        self.book_selector = QComboBox()
+        self.book_selector.currentIndexChanged.connect(self.update_book_preview)
+        self.book_selector.currentIndexChanged.connect(self.play_media)
+        self.channel_input = QLineEdit()
+        self.channel_link_input = QLineEdit()
+        book_layout.addWidget(QLabel("Livre :"))
+        book_layout.addWidget(self.book_selector)
+        book_layout.addWidget(QLabel("Nom du canal :"))
+        book_layout.addWidget(self.channel_input)
+        book_layout.addWidget(QLabel("Lien du canal :"))
+        book_layout.addWidget(self.channel_link_input)
+        left_layout.addLayout(book_layout)
+
+        # Totaux audio du cours sélectionné
+        self.audio_totals_label = QLabel("")
+        left_layout.addWidget(self.audio_totals_label)
+
+        # Bouton pour sélectionner une image de profil
+        self.channel_photo_path = None
+        self.btn_select_photo = QPushButton("📷 Choisir une photo du canal")
+        self.btn_select_photo.clicked.connect(self.select_channel_photo)
+        photo_hashtag_layout = QHBoxLayout()
+        photo_hashtag_layout.addWidget(self.btn_select_photo)
+
+        self.hashtag_input = QLineEdit("#dars")
+        self.hashtag_input.setMaximumWidth(100)
+        photo_hashtag_layout.addWidget(QLabel("Hashtag:"))
+        photo_hashtag_layout.addWidget(self.hashtag_input)
+        
+        self.main_channel_input = QLineEdit("majalisur_rahman")
+        photo_hashtag_layout.addWidget(QLabel("ID Canal de Menu :"))
+        photo_hashtag_layout.addWidget(self.main_channel_input)
+
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, 16)
+        self.concurrency_input.setValue(UPLOAD_CONCURRENCY)
+        photo_hashtag_layout.addWidget(QLabel("Envois parallèles :"))
+        photo_hashtag_layout.addWidget(self.concurrency_input)
+
+        self.albums_checkbox = QCheckBox("Albums (images sans audio)")
+        photo_hashtag_layout.addWidget(self.albums_checkbox)
+
+        self.preprocess_checkbox = QCheckBox("Optimiser les images")
+        photo_hashtag_layout.addWidget(self.preprocess_checkbox)
+
+        self.reconcile_checkbox = QCheckBox("Réconcilier avec le canal")
+        self.reconcile_checkbox.setToolTip(
+            "Relit l'historique du canal (légendes #dars) pour retrouver les leçons déjà publiées\n"
+            "avant d'envoyer les manquantes et de régénérer le menu."
+        )
+        photo_hashtag_layout.addWidget(self.reconcile_checkbox)
+
+        left_layout.addLayout(photo_hashtag_layout)
+
+        # Mode clonage : leçons copiées depuis un canal existant au lieu d'être ré-envoyées
+        clone_layout = QHBoxLayout()
+        self.clone_source_input = QLineEdit()
+        self.clone_source_input.setPlaceholderText("Lien du canal source (optionnel)")
+        clone_layout.addWidget(QLabel("Cloner depuis :"))
+        clone_layout.addWidget(self.clone_source_input)
+        left_layout.addLayout(clone_layout)
+
+        # Visualiseur
+        self.image_label = QLabel("[Aperçu image]")
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setFixedHeight(300)
+        left_layout.addWidget(self.image_label)
+
+        self.audio_slider = QSlider(Qt.Horizontal)
+        self.audio_slider.setRange(0, 100)
+        self.audio_slider.sliderMoved.connect(self.set_position)
+
+        left_layout.addWidget(self.audio_slider)
+
+        # Contrôles
+        controls = QHBoxLayout()
+        self.prev_button = QPushButton("⟸ Préc")
+        self.play_button = QPushButton("▶")
+        self.next_button = QPushButton("Suiv ⟹")
+        self.speed_minus = QPushButton("v-5")
+        self.speed_plus = QPushButton("v+5")
+
+        self.prev_button.clicked.connect(self.prev_media)
+        self.prev_button.clicked.connect(self.play_media)
+        self.play_button.clicked.connect(self.toggle_play)
+        self.next_button.clicked.connect(self.next_media)
+        self.next_button.clicked.connect(self.play_media)
+        self.speed_plus.clicked.connect(self.increase_speed)
+        self.speed_minus.clicked.connect(self.decrease_speed)
+
+        controls.addWidget(self.prev_button)
+        controls.addWidget(self.speed_minus)
+        controls.addWidget(self.play_button)
+        controls.addWidget(self.speed_plus)
+        controls.addWidget(self.next_button)
+        left_layout.addLayout(controls)
+
+        # Bouton envoi Telegram
+        self.send_button = QPushButton("Publier sur Telegram")
+        left_layout.addWidget(self.send_button)
+        self.send_button.clicked.connect(lambda: self.send_to_telegram())
+
+        # Simulation : plan de publication et durée estimée, sans connexion
+        self.dry_run_button = QPushButton("Simuler la publication (sans envoi)")
+        left_layout.addWidget(self.dry_run_button)
+        self.dry_run_button.clicked.connect(lambda: self.send_to_telegram(dry_run=True))
+
+        # Bouton publication de tous les livres, répartis sur tous les comptes
+        self.send_all_button = QPushButton("Publier tous les livres (tous les comptes)")
+        left_layout.addWidget(self.send_all_button)
+        self.send_all_button.clicked.connect(self.send_catalogue_to_telegram)
+
+        # File de publication et zone de log à droite
+        right_layout = QVBoxLayout()
+        right_layout.addLayout(self.setup_queue_panel())
+        right_layout.addWidget(self.log_output, stretch=1)
+        main_layout.addLayout(left_layout, stretch=3)
+        main_layout.addLayout(right_layout, stretch=2)
+        self.setLayout(main_layout)
+
+    def setup_queue_panel(self):
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("File de publication :"))
+        self.queue_table = QTableWidget(0, 5)
+        self.queue_table.setHorizontalHeaderLabels(["Livre", "Compte", "Priorité", "État", "Progression"])
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.queue_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_table.horizontalHeader().setStretchLastSection(True)
+        self.queue_table.setMaximumHeight(220)
+        layout.addWidget(self.queue_table)
+
+        add_layout = QHBoxLayout()
+        self.queue_priority_input = QSpinBox()
+        self.queue_priority_input.setRange(-10, 10)
+        add_layout.addWidget(QLabel("Priorité :"))
+        add_layout.addWidget(self.queue_priority_input)
+        self.enqueue_button = QPushButton("Ajouter le livre à la file")
+        self.enqueue_button.clicked.connect(self.enqueue_current_book)
+        add_layout.addWidget(self.enqueue_button)
+        self.enqueue_all_button = QPushButton("Ajouter tous les livres")
+        self.enqueue_all_button.clicked.connect(self.enqueue_all_books)
+        add_layout.addWidget(self.enqueue_all_button)
+        layout.addLayout(add_layout)
+
+        manage_layout = QHBoxLayout()
+        for label, delta in (("Priorité +", 1), ("Priorité −", -1)):
+            button = QPushButton(label)
+            button.clicked.connect(lambda _, d=delta: self.change_queue_priority(d))
+            manage_layout.addWidget(button)
+        self.retry_job_button = QPushButton("Relancer")
+        self.retry_job_button.clicked.connect(self.retry_queue_job)
+        manage_layout.addWidget(self.retry_job_button)
+        self.remove_job_button = QPushButton("Retirer")
+        self.remove_job_button.clicked.connect(self.remove_queue_job)
+        manage_layout.addWidget(self.remove_job_button)
+        layout.addLayout(manage_layout)
+
+        run_layout = QHBoxLayout()
+        self.queue_channels_input = QSpinBox()
+        self.queue_channels_input.setRange(1, 8)
+        self.queue_channels_input.setValue(QUEUE_CHANNELS)
+        run_layout.addWidget(QLabel("Canaux simultanés :"))
+        run_layout.addWidget(self.queue_channels_input)
+        self.run_queue_button = QPushButton("Lancer la file")
+        self.run_queue_button.clicked.connect(self.run_queue)
+        run_layout.addWidget(self.run_queue_button)
+        layout.addLayout(run_layout)
+
+        # Progression lue périodiquement depuis la file (mise à jour par le service Telegram)
+        self.queue_timer = QTimer(self)
+        self.queue_timer.timeout.connect(self.refresh_queue_panel)
+        self.queue_timer.start(QUEUE_REFRESH_INTERVAL_MS)
+        self.queue_rows = []
+        self.refresh_queue_panel()
+        return layout
+
+    def log(self, message):
+        self.logger.log(message)
+
+    @property
+    def player(self):
+        # QtMultimedia n'est chargé qu'au premier aperçu audio
+        if self._player is None:
+            from PyQt5.QtMultimedia import QMediaPlayer
+            self._player = QMediaPlayer()
+            self._player.positionChanged.connect(self.update_slider)
+            self._player.durationChanged.connect(self.update_duration)
+        return self._player
+
+    def redirect_print(self):
+        builtins.print = lambda *args, **kwargs: self.logger.log(" ".join(map(str, args)), "print")
+
+    def refresh_api_selector(self):
+        self.api_selector.clear()
+        for key in self.api_keys:
+            self.api_selector.addItem(key['name'])
+        if self.api_keys:
+            self.current_key = self.api_keys[0]
+
+    def select_api_key(self, index):
+        if 0 <= index < len(self.api_keys):
+            self.current_key = self.api_keys[index]
+
+    def add_api_key(self):
+        name, ok = QInputDialog.getText(self, "Nom de la clé", "Nom :")
+        if not ok: return
+        api_id, ok = QInputDialog.getInt(self, "API ID", "ID :")
+        if not ok: return
+        api_hash, ok = QInputDialog.getText(self, "API Hash", "Hash :")
+        if not ok: return
+        self.api_keys.append({"name": name, "api_id": api_id, "api_hash": api_hash})
+        save_api_keys(self.api_keys)
+        self.refresh_api_selector()
+
+    def select_books_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Sélectionner le dossier des livres")
+        if folder:
+            self.folder_input.setText(folder)
+            self.books = list_books(folder)
+            self.book_selector.clear()
+            self.book_selector.addItems(self.books)
+            if self.books:
+                self.book_selector.setCurrentIndex(0)
+
+    def update_book_preview(self):
+        index = self.book_selector.currentIndex()
+        if index < 0 or not self.books:
+            return
+        self.current_book = self.books[index]
+
+        course = self.current_course()
+        self.channel_input.setText(build_channel_title(self.current_book, course.nom_arabe, course.nom_latin))
+        self.current_index = 0
+        self.show_current_media()
+        self.request_audio_totals(course)
+
+    def request_audio_totals(self, course):
+        paths = [l["audio_path"] for l in course.lessons if l["audio_path"]]
+        if not paths:
+            self.audio_totals_label.setText("🎧 Aucun audio")
+            return
+        if self.audio_index is None:
+            from publisher import AudioIndex
+            self.audio_index = AudioIndex(logger=self.logger)
+        self.audio_totals_label.setText(f"🎧 {len(paths)} audio(s), calcul de la durée...")
+        self.audio_pool.start(AudioTotalsTask(self.current_book, paths, self.audio_index, self.audio_signals))
+
+    def on_audio_totals(self, book, summary):
+        if book != self.current_book:
+            return  # un autre cours a été sélectionné entre-temps
+        if summary is None:
+            self.audio_totals_label.setText("⚠️ Durée des audios indisponible")
+            return
+        from publisher.planner import format_duration
+        text = f"🎧 {summary['count']} audio(s), durée totale {format_duration(summary['seconds'])}"
+        if summary["bitrate"]:
+            text += f", {summary['bitrate']} kbit/s en moyenne"
+        if summary["measured"] < summary["count"]:
+            text += f" ({summary['count'] - summary['measured']} illisible(s))"
+        self.audio_totals_label.setText(text)
+
+    def current_course(self):
+        # Index du livre courant (reconstruit seulement si les dossiers ont changé)
+        book_path = os.path.join(self.folder_input.text(), self.current_book)
+        return CourseIndex.get(book_path, self.logger)
+
+    def show_current_media(self):
+        lessons = self.current_course().lessons
+        if not lessons:
+            self.image_label.setText("Aucune image")
+            return
+
+        lesson = lessons[min(self.current_index, len(lessons) - 1)]
+        self.displayed_image = lesson["img_path"]
+        pixmap = self.thumbnails.get(lesson["img_path"])
+        if pixmap is not None:
+            self.image_label.setPixmap(pixmap)
+        else:
+            self.image_label.setText("Chargement...")
+            self.thumbnails.request(lesson["img_path"])
+
+        # Précharger les leçons voisines (les plus proches d'abord)
+        for offset in range(1, THUMB_PREFETCH + 1):
+            for i in (self.current_index + offset, self.current_index - offset):
+                if 0 <= i < len(lessons):
+                    self.thumbnails.request(lessons[i]["img_path"])
+
+        if lesson["audio_path"]:
+            from PyQt5.QtMultimedia import QMediaContent
+            self.player.setMedia(QMediaContent(QUrl.fromLocalFile(lesson["audio_path"])))
+            self.audio_slider.setValue(0)
+
+    def on_thumbnail_ready(self, path):
+        if path == self.displayed_image:
+            self.image_label.setPixmap(self.thumbnails.get(path))
+
+    def select_channel_photo(self):
+        file_dialog = QFileDialog(self)
+        file_dialog.setNameFilter("Images (*.png *.jpg *.jpeg)")
+        if file_dialog.exec_():
+            selected_files = file_dialog.selectedFiles()
+            if selected_files:
+                self.channel_photo_path = selected_files[0]
+                self.logger.log(f"🖼️ Photo sélectionnée : {self.channel_photo_path}")
+
+    def toggle_play(self):
+        if self.player.state() == self.player.PlayingState:
+            self.player.pause()
+            self.play_button.setText("▶")
+        else:
+            self.player.play()
+            self.play_button.setText("⏸")
+
+    def play_media(self):
+        self.player.play()
+        self.play_button.setText("⏸")
+
+    def prev_media(self):
+        if self.current_index > 0:
+            self.current_index -= 1
+            self.show_current_media()
+
+    def next_media(self):
+        if self.current_index < len(self.current_course()) - 1:
+            self.current_index += 1
+            self.show_current_media()
+
+    def increase_speed(self):
+        self.player.setPlaybackRate(self.player.playbackRate() + 0.5)
+
+    def decrease_speed(self):
+        self.player.setPlaybackRate(max(0.5, self.player.playbackRate() - 0.5))
+
+    def update_slider(self, position):
+        if self.player.duration() > 0:
+            self.audio_slider.setValue(int(position * 100 / self.player.duration()))
+
+    def set_position(self, value):
+        if self._player and self.player.duration() > 0:
+            self.player.setPosition(int(value * self.player.duration() / 100))
+
+    def update_duration(self, duration):
+        self.audio_slider.setEnabled(duration > 0)
+
+    def current_job(self):
+        """Job de publication du livre courant d'après le formulaire (None si le lien est invalide)."""
+        # Vérifier le lien du canal
+        raw_input = self.channel_link_input.text().strip()
+        channel_link = None
+        invite_code = None
+
+        if raw_input:
+            # 1) Lien Telegram complet
+            pattern_full = r"^https:\/\/t\.me\/([\w\d_]+|\+[\w\d\-_]+)(.*)?$"
+            # 2) Nom public (sans https://)
+            pattern_username = r"^[A-Za-z0-9_]{5,32}$"
+            # 3) Code privé (commence par +) sans https://
+            pattern_private = r"^\+[\w\d\-_]+$"
+
+            m = re.match(pattern_full, raw_input)
+            if m:
+                channel_link = raw_input
+                if m.group(1).startswith("+"):
+                    invite_code = m.group(1)[1:]  # enlever le "+"
+            elif re.match(pattern_private, raw_input):
+                channel_link = f"https://t.me/{raw_input}"
+                invite_code = raw_input[1:]
+            elif re.match(pattern_username, raw_input):
+                channel_link = f"https://t.me/{raw_input}"
+            else:
+                QMessageBox.critical(
+                    self,
+                    "Lien invalide",
+                    "Le lien ou identifiant de canal Telegram est invalide.\n"
+                    "Exemples valides :\n"
+                    "- https://t.me/majalisur_rahman\n"
+                    "- majalisur_rahman\n"
+                    "- +7emQpsaabF9mZDdk"
+                )
+                return None
+        
+        clone_from = self.clone_source_input.text().strip() or None
+        if clone_from and not clone_from.startswith("https://t.me/"):
+            clone_from = f"https://t.me/{clone_from}"
+
+        return build_publish_job(
+            self.folder_input.text(), self.current_book, self.hashtag_input.text(),
+            channel_link, self.main_channel_input.text(), self.channel_photo_path, self.logger,
+            self.albums_checkbox.isChecked(), self.preprocess_checkbox.isChecked(), clone_from,
+            "resume" if self.reconcile_checkbox.isChecked() else None
+        )
+
+    def send_to_telegram(self, dry_run=False):
+        if not hasattr(self, "current_key"):
+            QMessageBox.warning(self, "Erreur", "Aucune clé API sélectionnée.")
+            return
+
+        api_name = self.current_key['name']
+        job = self.current_job()
+        if job is None:
+            return
+
+        if dry_run:
+            from publisher import build_plan, format_plan
+            plan = build_plan(job, api_name, self.concurrency_input.value())
+            for line in format_plan(plan):
+                self.logger.log(line)
+            return
+
+        # ✅ Publication via la file : un seul job par (compte, livre), même sur un double clic
+        # ou si la file publie déjà ce livre ; le client déjà connecté est réutilisé
+        self.add_to_queue(api_name, job)
+        self.refresh_queue_panel()
+        self.run_queue()
+
+
+    def send_catalogue_to_telegram(self):
+        if not self.api_keys:
+            QMessageBox.warning(self, "Erreur", "Aucune clé API enregistrée.")
+            return
+        if not self.books:
+            QMessageBox.warning(self, "Erreur", "Aucun livre dans le dossier sélectionné.")
+            return
+
+        if self.catalogue_future and not self.catalogue_future.done():
+            self.logger.log("ℹ️ La publication multi-comptes est déjà en cours.")
+            return
+
+        jobs = [
+            build_publish_job(self.folder_input.text(), book, self.hashtag_input.text(),
+                              main_channel_id=self.main_channel_input.text(), logger=self.logger,
+                              albums=self.albums_checkbox.isChecked(),
+                              preprocess=self.preprocess_checkbox.isChecked(),
+                              reconcile="resume" if self.reconcile_checkbox.isChecked() else None)
+            for book in self.books
+        ]
+
+        # ✅ Soumettre au service client
+        from publisher import publish_catalogue
+        self.catalogue_future = self.client_service.run(
+            publish_catalogue, self.api_keys, jobs, self.logger, self.concurrency_input.value(),
+            service=self.client_service
+        )
+        self.catalogue_future.add_done_callback(lambda f: self._on_job_done(f, "✅ Publication multi-comptes terminée."))
+
+    # === File de publication ===
+    def enqueue_current_book(self):
+        if not hasattr(self, "current_key") or not self.current_book:
+            QMessageBox.warning(self, "Erreur", "Sélectionnez une clé API et un livre.")
+            return
+        job = self.current_job()
+        if job is None:
+            return
+        self.add_to_queue(self.current_key['name'], job)
+        self.refresh_queue_panel()
+
+    def enqueue_all_books(self):
+        if not hasattr(self, "current_key") or not self.books:
+            QMessageBox.warning(self, "Erreur", "Sélectionnez une clé API et un dossier de livres.")
+            return
+        for book in self.books:
+            job = build_publish_job(self.folder_input.text(), book, self.hashtag_input.text(),
+                                    main_channel_id=self.main_channel_input.text(), logger=self.logger,
+                                    albums=self.albums_checkbox.isChecked(),
+                                    preprocess=self.preprocess_checkbox.isChecked(),
+                                    reconcile="resume" if self.reconcile_checkbox.isChecked() else None)
+            self.add_to_queue(self.current_key['name'], job, quiet=True)
+        self.logger.log(f"📋 {len(self.books)} livre(s) ajouté(s) à la file ({self.current_key['name']}).")
+        self.refresh_queue_panel()
+
+    def add_to_queue(self, account, job, quiet=False):
+        _, result = self.job_queue.add(account, job, self.queue_priority_input.value())
+        book = job["book_name"]
+        if result == JobQueue.UNCHANGED:
+            self.logger.log(f"ℹ️ {book} est déjà en cours de publication ({account}) avec ces paramètres.")
+        elif result == JobQueue.FOLLOW_UP:
+            self.logger.log(f"📋 {book} est en cours de publication ({account}) : "
+                            f"les nouveaux paramètres seront publiés juste après.")
+        elif result == JobQueue.UPDATED:
+            self.logger.log(f"📋 {book} déjà dans la file ({account}) : paramètres et priorité mis à jour.")
+        elif not quiet:
+            self.logger.log(f"📋 {book} ajouté à la file ({account}).")
+        return result
+
+    def selected_queue_job(self):
+        row = self.queue_table.currentRow()
+        return self.queue_rows[row] if 0 <= row < len(self.queue_rows) else None
+
+    def change_queue_priority(self, delta):
+        job = self.selected_queue_job()
+        if job:
+            self.job_queue.set_priority(job["id"], job["priority"] + delta)
+            self.refresh_queue_panel()
+
+    def retry_queue_job(self):
+        job = self.selected_queue_job()
+        if job:
+            self.job_queue.retry(job["id"])
+            self.refresh_queue_panel()
+
+    def remove_queue_job(self):
+        job = self.selected_queue_job()
+        if job and not self.job_queue.remove(job["id"]):
+            self.logger.log("⚠️ Un cours en cours de publication ne peut pas être retiré.")
+        self.refresh_queue_panel()
+
+    def run_queue(self):
+        # Une seule exécution de la file à la fois : les cours ajoutés entre-temps y sont repris
+        if self.queue_future and not self.queue_future.done():
+            self.logger.log("ℹ️ La file est déjà en cours d'exécution (les cours ajoutés y sont repris).")
+            return
+        if not self.job_queue.pending_count():
+            self.logger.log("ℹ️ Aucun cours en attente dans la file.")
+            return
+        from publisher import run_job_queue
+        self.queue_future = self.client_service.run(
+            run_job_queue, self.job_queue, self.client_service, self.api_keys, self.logger,
+            self.queue_channels_input.value(), self.concurrency_input.value(), authorize=self._authorize_client
+        )
+        self.queue_future.add_done_callback(lambda f: self._on_job_done(f, "✅ File de publication terminée."))
+
+    def refresh_queue_panel(self):
+        selected = self.selected_queue_job()
+        self.queue_rows = self.job_queue.jobs()
+        self.queue_table.setRowCount(len(self.queue_rows))
+        for row, job in enumerate(self.queue_rows):
+            cells = (job["book_name"], job["account"], str(job["priority"]), QUEUE_STATES.get(job["state"], job["state"]))
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if job["error"]:
+                    item.setToolTip(job["error"])
+                self.queue_table.setItem(row, column, item)
+            bar = self.queue_table.cellWidget(row, 4)
+            if bar is None:
+                bar = QProgressBar()
+                self.queue_table.setCellWidget(row, 4, bar)
+            bar.setMaximum(max(1, job["total"]))
+            bar.setValue(job["done"])
+            bar.setFormat(f"{job['done']}/{job['total']}" if job["total"] else "")
+            if selected and job["id"] == selected["id"]:
+                self.queue_table.selectRow(row)
+
+    def _on_job_done(self, future, message):
+        # Rappel du Future de ClientService.run (file de publication ou multi-comptes), exécuté
+        # dans le thread du service : seul le logger est utilisé, il met les lignes en attente
+        # et la minuterie Qt les affiche depuis le thread de l'interface
+        try:
+            future.result()
+            self.logger.log(message)
+        except Exception as e:
+            self.logger.log(f"❌ Erreur inattendue (envoi Telegram) : {e}")
+            self.logger.log("".join(traceback.format_exception(type(e), e, e.__traceback__)))
+
+    async def _authorize_client(self, client):
+        phone, ok = QInputDialog.getText(self, "Connexion Telegram", "📱 Entrez votre numéro de téléphone :")
+        if not ok or not phone:
+            self.logger.log("❌ Téléphone non fourni.")
+            return False
+
+        try:
+            await client.send_code_request(phone)
+        except Exception as e:
+            self.logger.log(f"❌ Erreur envoi code : {e}")
+            return False
+
+        code, ok = QInputDialog.getText(self, "Connexion Telegram", "🔐 Entrez le code reçu :")
+        if not ok or not code:
+            self.logger.log("❌ Code non fourni.")
+            return False
+
+        try:
+            await client.sign_in(phone=phone, code=code)
+        except Exception as e:
+            self.logger.log(f"❌ Erreur de connexion : {e}")
+            return False
+        return True
+
+    def closeEvent(self, event):
+        self.queue_timer.stop()
+        self.client_service.stop()
+        self.job_queue.close()
+        if self.audio_index:
+            self.audio_pool.waitForDone(2000)
+            self.audio_index.close()
+        self.logger.close()
+        super().closeEvent(event)
+
+def main():
+    app = QApplication(sys.argv)
+    win = BookUploader()
+    win.show()
+    return app.exec_()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Cœur de publication des cours sur Telegram, sans dépendance à l'interface PyQt :
+utilisé par l'application graphique (gui.py) et par le mode sans interface
+(`python app.py publish ...`, voir publisher/cli.py).
+
+Seuls les réglages et l'analyse des cours (bibliothèque standard) sont chargés à
+l'import ; les autres modules, et Telethon avec eux, le sont au premier accès à
+l'un de leurs noms (ex. `from publisher import publish_course`).
+"""
+import importlib
+
+from .settings import (
+    API_KEYS_FILE, SESSIONS_DIR, UPLOAD_CONCURRENCY, QUEUE_CHANNELS, load_api_keys, save_api_keys
+)
+from .course import (
+    extraire_numero, normalize_name, file_digest, list_books, list_lessons, course_bytes,
+    read_course_config, build_channel_title, normalize_hashtag, build_publish_job, CourseIndex
+)
+
+# Nom exporté -> module qui le définit (chargé à la demande)
+_LAZY = {
+    "PublishJournal": "journal",
+    "MediaCache": "media_cache",
+    "EntityCache": "entity_cache",
+    "MainMenu": "menus", "utf16_len": "menus", "chunk_lines": "menus", "sync_blocks": "menus",
+    "JsonlLogSink": "logs",
+    "PublishMetrics": "metrics",
+    "build_plan": "planner", "format_plan": "planner",
+    "TokenBucket": "scheduler", "RateScheduler": "scheduler", "ScheduledClient": "scheduler",
+    "JobQueue": "jobs",
+    "UploadEngine": "engine",
+    "ParallelUploader": "uploader",
+    "ImagePreprocessor": "images",
+    "AudioIndex": "audio", "read_audio_meta": "audio",
+    "ClientService": "service",
+    "get_channel_entity": "pipeline", "publish_course": "pipeline", "PrefixedLogger": "pipeline",
+    "connect_authorized_accounts": "pipeline", "publish_catalogue": "pipeline", "publish_queue": "pipeline",
+    "run_job_queue": "pipeline",
+    "CourseWatcher": "watch", "watch_courses": "watch",
+}
+
+__all__ = [
+    "API_KEYS_FILE", "SESSIONS_DIR", "UPLOAD_CONCURRENCY", "QUEUE_CHANNELS", "load_api_keys", "save_api_keys",
+    "extraire_numero", "normalize_name", "file_digest", "list_books", "list_lessons", "course_bytes",
+    "read_course_config", "build_channel_title", "normalize_hashtag", "build_publish_job", "CourseIndex",
+]
+__all__ += list(_LAZY)  # noms chargés à la demande
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
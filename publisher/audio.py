@@ -0,0 +1,257 @@
+import os
+import json
+import asyncio
+import sqlite3
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, BrokenExecutor
+
+from .settings import AUDIO_INDEX_PATH
+
+# === Lecture des métadonnées MP3 (durée, débit, titre, interprète) ===
+BITRATES = {  # (MPEG-1 ?, couche) -> kbit/s par index
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+ID3_TEXT_FRAMES = {b"TIT2": "title", b"TPE1": "performer", b"TT2": "title", b"TP1": "performer"}
+
+def _syncsafe(data):
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+def _id3_text(data):
+    encoding, text = data[:1], data[1:]
+    codec = {b"\x00": "latin-1", b"\x01": "utf-16", b"\x02": "utf-16-be", b"\x03": "utf-8"}.get(encoding, "latin-1")
+    return text.decode(codec, "replace").replace("\x00", " ").strip() or None
+
+def _parse_id3v2(tag, version):
+    tags = {}
+    pos = 0
+    id_len, header_len = (3, 6) if version == 2 else (4, 10)
+    while pos + header_len <= len(tag) and tag[pos] != 0:
+        frame_id = tag[pos:pos + id_len]
+        if version == 2:
+            size = int.from_bytes(tag[pos + 3:pos + 6], "big")
+        elif version == 4:
+            size = _syncsafe(tag[pos + 4:pos + 8])
+        else:
+            size = int.from_bytes(tag[pos + 4:pos + 8], "big")
+        body = tag[pos + header_len:pos + header_len + size]
+        if frame_id in ID3_TEXT_FRAMES and body:
+            tags.setdefault(ID3_TEXT_FRAMES[frame_id], _id3_text(body))
+        pos += header_len + size
+    return tags
+
+def _frame_header(data, i):
+    """(mpeg1, couche, débit kbit/s, fréquence, longueur de trame, mono) ou None si pas une trame valide."""
+    if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[i + 1] >> 3) & 3
+    layer = 4 - ((data[i + 1] >> 1) & 3)
+    bitrate_index = data[i + 2] >> 4
+    rate_index = (data[i + 2] >> 2) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = BITRATES[(mpeg1, layer)][bitrate_index]
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    padding = (data[i + 2] >> 1) & 1
+    if layer == 1:
+        length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        length = (144 if mpeg1 or layer == 2 else 72) * bitrate * 1000 // sample_rate + padding
+    return mpeg1, layer, bitrate, sample_rate, length, (data[i + 3] >> 6) == 3
+
+def read_audio_meta(path):
+    """
+    Métadonnées d'un MP3 (exécuté dans un processus du pool) : durée en secondes,
+    débit moyen en kbit/s, titre et interprète des balises ID3. Les MP3 à débit
+    variable sont mesurés par leur en-tête Xing/Info ou VBRI ; sinon la durée est
+    déduite de la taille et du débit de la première trame.
+    """
+    meta = {"duration": None, "bitrate": None, "title": None, "performer": None}
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(10)
+        start = 0
+        if head[:3] == b"ID3" and len(head) == 10:
+            tag_size = _syncsafe(head[6:10])
+            tag = f.read(tag_size)
+            if head[5] & 0x80 and head[3] < 4:
+                tag = tag.replace(b"\xff\x00", b"\xff")  # désynchronisation
+            meta.update({k: v for k, v in _parse_id3v2(tag, head[3]).items() if v})
+            start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+        end = size
+        if size >= 128:
+            f.seek(size - 128)
+            v1 = f.read(128)
+            if v1[:3] == b"TAG":
+                end -= 128
+                meta["title"] = meta["title"] or v1[3:33].rstrip(b"\x00 ").decode("latin-1") or None
+                meta["performer"] = meta["performer"] or v1[33:63].rstrip(b"\x00 ").decode("latin-1") or None
+        f.seek(start)
+        data = f.read(64 * 1024)
+
+    # Première trame MPEG (confirmée par la suivante quand elle est dans le tampon)
+    for i in range(max(0, len(data) - 4)):
+        header = _frame_header(data, i)
+        if header and (i + header[4] + 4 > len(data) or _frame_header(data, i + header[4])):
+            break
+    else:
+        return meta
+    mpeg1, layer, bitrate, sample_rate, _, mono = header
+    samples = 384 if layer == 1 else 1152 if mpeg1 or layer == 2 else 576
+    audio_bytes = end - start - i
+
+    frames = None
+    side = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    xing = i + 4 + side
+    if data[xing:xing + 4] in (b"Xing", b"Info") and int.from_bytes(data[xing + 4:xing + 8], "big") & 1:
+        frames = int.from_bytes(data[xing + 8:xing + 12], "big")
+    elif data[i + 36:i + 40] == b"VBRI":
+        frames = int.from_bytes(data[i + 50:i + 54], "big")
+    if frames:
+        duration = frames * samples / sample_rate
+        bitrate = round(audio_bytes * 8 / duration / 1000) if duration else bitrate
+    else:
+        duration = audio_bytes * 8 / (bitrate * 1000)
+    meta["duration"] = round(duration)
+    meta["bitrate"] = bitrate
+    return meta
+
+# === Index des métadonnées audio (cache SQLite + pool de processus) ===
+class AudioIndex:
+    """
+    Métadonnées des audios des cours, calculées une seule fois par fichier (clé :
+    chemin, taille, date) dans un pool de processus, hors du chemin critique de
+    l'envoi. Le moteur d'envoi en tire des attributs audio tout prêts (durée,
+    titre, interprète) ; l'interface en tire les totaux d'un cours.
+    """
+
+    def __init__(self, path=AUDIO_INDEX_PATH, workers=None, logger=None):
+        self.path = path
+        self.workers = workers
+        self.logger = logger
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS audio (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, meta TEXT)"
+        )
+        self.conn.commit()
+        self.executor = None
+        self.futures = {}
+        self.broken = False
+
+    def _pool(self):
+        if self.executor is None:
+            # "spawn" : pas de fork d'un processus multi-thread (Qt, asyncio)
+            self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    # --- Cache
+    def get(self, path):
+        """Métadonnées en cache si le fichier n'a pas changé depuis, sinon None."""
+        st = os.stat(path)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT meta FROM audio WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _store(self, path, meta):
+        st = os.stat(path)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO audio (path, size, mtime_ns, meta) VALUES (?, ?, ?, ?)",
+                (os.path.abspath(path), st.st_size, st.st_mtime_ns, json.dumps(meta))
+            )
+            self.conn.commit()
+
+    def _failed(self, path, error):
+        if isinstance(error, BrokenExecutor):
+            # Pool hors service (processus de travail morts) : signalé une fois, pas fichier par
+            # fichier ; le fichier n'est pas en cause, il sera relu à la prochaine analyse
+            if self.logger and not self.broken:
+                self.logger.log(f"⚠️ Pool d'analyse audio hors service ({error}) : "
+                                f"audios envoyés sans durée ni titre.")
+            self.broken = True
+            return
+        if self.logger:
+            self.logger.log(f"⚠️ Métadonnées audio illisibles pour {os.path.basename(path)} : {error}")
+        # Mémorisé vide : le fichier n'est pas relu tant qu'il ne change pas
+        self._store(path, {"duration": None, "bitrate": None, "title": None, "performer": None})
+
+    # --- Pendant une publication (boucle asyncio)
+    def start(self, paths):
+        """Soumet au pool les audios absents du cache ; leur analyse avance pendant les envois."""
+        loop = asyncio.get_running_loop()
+        for path in paths:
+            if path not in self.futures and self.get(path) is None:
+                self.futures[path] = loop.run_in_executor(self._pool(), read_audio_meta, path)
+
+    async def meta(self, path):
+        cached = self.get(path)
+        if cached is not None:
+            return cached
+        if path not in self.futures:
+            self.start([path])
+        try:
+            meta = await self.futures.pop(path)
+        except Exception as e:
+            self._failed(path, e)
+            return None
+        self._store(path, meta)
+        return meta
+
+    async def attributes(self, path):
+        """Attributs Telegram de l'audio (durée, titre, interprète), ou None si inconnus."""
+        meta = await self.meta(path)
+        if not meta or meta["duration"] is None:
+            return None
+        from telethon.tl.types import DocumentAttributeAudio
+        return [DocumentAttributeAudio(duration=meta["duration"], title=meta["title"],
+                                       performer=meta["performer"])]
+
+    # --- Indexation complète (interface, thread de travail)
+    def build(self, paths):
+        """Analyse (bloquante) des fichiers absents du cache ; retourne {chemin: métadonnées}."""
+        result = {path: self.get(path) for path in paths}
+        missing = [path for path, meta in result.items() if meta is None]
+        if missing:
+            futures = {path: self._pool().submit(read_audio_meta, path) for path in missing}
+            for path, future in futures.items():
+                try:
+                    result[path] = future.result()
+                    self._store(path, result[path])
+                except Exception as e:
+                    self._failed(path, e)
+        return result
+
+    @staticmethod
+    def summary(metas):
+        """Totaux d'un cours : nombre d'audios, durée totale (s), débit moyen (kbit/s)."""
+        known = [m for m in metas.values() if m and m["duration"]]
+        seconds = sum(m["duration"] for m in known)
+        bitrate = round(sum(m["bitrate"] * m["duration"] for m in known) / seconds) if seconds else None
+        return {"count": len(metas), "measured": len(known), "seconds": seconds, "bitrate": bitrate}
+
+    def shutdown(self):
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def close(self):
+        self.shutdown()
+        with self._lock:
+            self.conn.close()
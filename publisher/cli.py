@@ -0,0 +1,190 @@
+"""
+Publication sans interface graphique (serveur, cron) :
+
+    python app.py publish --books-dir ~/Cours --all
+    python app.py publish --books-dir ~/Cours --book MonCours --api principal
+    python app.py publish --books-dir ~/Cours --all --parallel 2
+    python app.py publish --books-dir ~/Cours --all --all-accounts
+    python app.py publish --books-dir ~/Cours --book MonCours --dry-run --verbose
+    python app.py publish --books-dir ~/Cours --all --watch
+    python app.py publish --books-dir ~/Cours --book MonCours --clone-from https://t.me/ancien_canal --channel-link https://t.me/+code
+    python app.py publish --books-dir ~/Cours --book MonCours --channel-link https://t.me/mon_canal --reconcile
+
+Le journal des opérations est écrit sur stderr (et en JSONL avec --log-jsonl), le résumé JSON sur stdout.
+Avec --watch, la commande reste active (Ctrl+C pour l'arrêter) et publie les leçons
+ajoutées aux cours au fil de l'eau.
+Code de sortie : 0 si tous les cours ont été publiés, 1 si au moins un a échoué,
+2 en cas de paramètres invalides ou de compte non autorisé.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+from .settings import SESSIONS_DIR, UPLOAD_CONCURRENCY, load_api_keys
+from .course import list_books, build_publish_job
+from .logs import JsonlLogSink
+from .metrics import PublishMetrics, connect_span
+from .planner import build_plan, format_plan
+
+class ConsoleLogger:
+    def __init__(self, sink=None):
+        self.sink = sink
+
+    def log(self, text):
+        print(text, file=sys.stderr, flush=True)
+        if self.sink:
+            self.sink.write(str(text))
+            self.sink.flush()
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="app.py publish",
+        description="Publie des cours sur Telegram sans interface graphique."
+    )
+    parser.add_argument("--books-dir", required=True, help="dossier contenant un sous-dossier par livre")
+    books = parser.add_mutually_exclusive_group(required=True)
+    books.add_argument("--all", action="store_true", help="publier tous les livres du dossier")
+    books.add_argument("--book", action="append", metavar="NOM", help="livre à publier (répétable)")
+    parser.add_argument("--api", metavar="NOM", help="clé API à utiliser (par défaut : la première)")
+    parser.add_argument("--all-accounts", action="store_true",
+                        help="répartir les livres entre tous les comptes autorisés")
+    parser.add_argument("--hashtag", default="#dars")
+    parser.add_argument("--main-channel", default="majalisur_rahman", help="canal de menu principal ('' pour aucun)")
+    parser.add_argument("--channel-link", help="canal existant (un seul livre)")
+    parser.add_argument("--channel-photo", help="photo des canaux créés")
+    parser.add_argument("--clone-from", metavar="LIEN",
+                        help="canal source (un seul livre) : ses leçons sont copiées par transferts groupés, sans ré-upload")
+    parser.add_argument("--reconcile", nargs="?", const="resume", choices=("resume", "full"),
+                        help="reconstruire le journal depuis l'historique du canal avant de publier "
+                             "(resume : messages lus depuis la dernière réconciliation ; full : tout l'historique)")
+    parser.add_argument("--albums", action="store_true",
+                        help="grouper les leçons sans audio consécutives en albums (10 images max)")
+    parser.add_argument("--preprocess", action="store_true",
+                        help="alléger les images avant envoi (redimensionnement, PNG → JPEG ; nécessite Pillow)")
+    parser.add_argument("--parallel", type=int, default=1, help="nombre de cours publiés en même temps")
+    parser.add_argument("--concurrency", type=int, default=UPLOAD_CONCURRENCY, help="envois de fichiers simultanés par cours")
+    parser.add_argument("--watch", action="store_true",
+                        help="rester actif et publier les nouvelles leçons déposées dans les cours (un seul compte)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="plan de publication et durée estimée, sans connexion ni envoi")
+    parser.add_argument("--verbose", action="store_true", help="avec --dry-run : détail de chaque leçon")
+    parser.add_argument("--log-jsonl", metavar="FICHIER", help="copie structurée du journal (une ligne JSON par message)")
+    parser.add_argument("--prometheus-dir", metavar="DOSSIER",
+                        help="dossier du collecteur textfile de node_exporter (mesures de performance par cours)")
+    return parser
+
+def normalize_channel_link(raw):
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    return raw if raw.startswith("https://t.me/") else f"https://t.me/{raw}"
+
+async def connect_account(key, logger):
+    from telethon import TelegramClient
+    session_path = os.path.join(SESSIONS_DIR, f"session_{key['name']}.session")
+    os.makedirs(os.path.dirname(session_path), exist_ok=True)
+    client = TelegramClient(session_path, key['api_id'], key['api_hash'])
+    with connect_span(key['name']):
+        await client.connect()
+        if not await client.is_user_authorized():
+            if not sys.stdin.isatty():
+                logger.log(f"❌ Session '{key['name']}' non autorisée : connectez-vous une première fois en mode interactif.")
+                await client.disconnect()
+                return None
+            # Demande le téléphone et le code dans le terminal
+            await client.start()
+    return client
+
+async def run(args, logger):
+    """Retourne la liste des résultats par cours, ou None si la publication n'a pas pu démarrer."""
+    api_keys = load_api_keys()
+    if not api_keys and not args.dry_run:
+        logger.log("❌ Aucune clé API enregistrée.")
+        return None
+
+    if not os.path.isdir(args.books_dir):
+        logger.log(f"❌ Dossier de livres introuvable : {args.books_dir}")
+        return None
+    book_names = list_books(args.books_dir) if args.all else args.book
+    missing = [b for b in book_names if not os.path.isdir(os.path.join(args.books_dir, b))]
+    if missing:
+        logger.log(f"❌ Livre(s) introuvable(s) : {', '.join(missing)}")
+        return None
+    if args.channel_link and len(book_names) != 1:
+        logger.log("❌ --channel-link n'a de sens qu'avec un seul livre.")
+        return None
+    if args.clone_from and len(book_names) != 1:
+        logger.log("❌ --clone-from n'a de sens qu'avec un seul livre.")
+        return None
+    if args.watch and (args.all_accounts or args.dry_run):
+        logger.log("❌ --watch s'utilise avec un seul compte, sans --dry-run.")
+        return None
+
+    jobs = [
+        build_publish_job(args.books_dir, book, args.hashtag, normalize_channel_link(args.channel_link),
+                          args.main_channel, args.channel_photo, logger, args.albums, args.preprocess,
+                          normalize_channel_link(args.clone_from), args.reconcile)
+        for book in book_names
+    ]
+
+    if args.dry_run:
+        # Plan hors ligne : aucune connexion, le journal du compte indique les leçons déjà publiées
+        api_name = args.api or (api_keys[0]['name'] if api_keys else None)
+        results = []
+        for job in jobs:
+            plan = build_plan(job, api_name, args.concurrency)
+            for line in format_plan(plan, details=args.verbose):
+                logger.log(line)
+            results.append({"ok": True, "book": job["book_name"], "plan": plan})
+        return results
+
+    # Telethon et le pipeline ne sont chargés que pour une vraie publication (pas pour --dry-run)
+    from .pipeline import publish_queue, publish_catalogue
+    from .watch import watch_courses
+
+    if args.all_accounts:
+        return await publish_catalogue(api_keys, jobs, logger, args.concurrency)
+
+    key = next((k for k in api_keys if k['name'] == args.api), None) if args.api else api_keys[0]
+    if key is None:
+        logger.log(f"❌ Clé API inconnue : {args.api}")
+        return None
+    client = await connect_account(key, logger)
+    if client is None:
+        return None
+    try:
+        if args.watch:
+            return await watch_courses(client, jobs, logger, key['name'], args.concurrency)
+        return await publish_queue(client, jobs, logger, key['name'], args.parallel, args.concurrency)
+    finally:
+        await client.disconnect()
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logger = ConsoleLogger(JsonlLogSink(args.log_jsonl) if args.log_jsonl else None)
+    if args.prometheus_dir:
+        PublishMetrics.textfile_dir = args.prometheus_dir
+    started = time.monotonic()
+    try:
+        results = asyncio.run(run(args, logger))
+    except KeyboardInterrupt:
+        if not args.watch:
+            raise
+        logger.log("⏹️ Surveillance arrêtée.")
+        results = []
+    finally:
+        if logger.sink:
+            logger.sink.close()
+    if results is None:
+        print(json.dumps({"ok": False, "jobs": []}, ensure_ascii=False))
+        return 2
+    ok = all(r["ok"] for r in results)
+    print(json.dumps({
+        "ok": ok,
+        "seconds": round(time.monotonic() - started, 2),
+        "jobs": results,
+    }, ensure_ascii=False, indent=2))
+    return 0 if ok else 1
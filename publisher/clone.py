@@ -0,0 +1,103 @@
+import asyncio
+
+from .settings import FORWARD_BATCH_SIZE
+from .journal import PublishJournal
+
+HISTORY_PAGE_SIZE = 100  # messages lus par appel (maximum Telegram)
+
+async def scan_lessons(client, entity, hashtag, names, page=HISTORY_PAGE_SIZE, min_id=0, menus=None,
+                       menu_markers=()):
+    """
+    Messages des leçons publiées dans un canal, lus du plus ancien au plus récent :
+    {base_name: [id du message image, id du message audio ou None]}.
+    Une image est reconnue à sa légende « hashtag base_name », son audio au document
+    sans légende qui la suit immédiatement. Pour une leçon publiée plusieurs fois,
+    la publication la plus récente est retenue. Avec `min_id`, seuls les messages
+    postérieurs à cet id sont lus. Avec une liste `menus`, les messages texte qui
+    commencent par l'un des `menu_markers` y sont ajoutés ([id, texte], dans l'ordre).
+    """
+    prefix = f"{hashtag} "
+    found = {}
+    current = None  # leçon dont l'audio peut suivre
+    last_id = min_id
+    while True:
+        batch = await client.get_messages(entity, limit=page, offset_id=last_id, reverse=True)
+        if not batch:
+            break
+        for msg in batch:
+            last_id = max(last_id, msg.id)
+            text = (getattr(msg, "message", None) or "").strip()
+            if getattr(msg, "photo", None) and text.startswith(prefix):
+                name = text[len(prefix):].strip()
+                current = name if name in names else None
+                if current:
+                    found[current] = [msg.id, None]
+            elif getattr(msg, "document", None) and not text and current:
+                found[current][1] = msg.id
+                current = None
+            elif (menus is not None and not getattr(msg, "photo", None) and not getattr(msg, "document", None)
+                  and text.startswith(menu_markers)):
+                menus.append([msg.id, text])
+                current = None
+            else:
+                current = None
+        if len(batch) < page:
+            break
+    return found
+
+async def clone_lessons(client, source, target, lessons, hashtag, journal, msg_ids, logger,
+                        batch_size=FORWARD_BATCH_SIZE):
+    """
+    Copie dans `target` les leçons déjà publiées dans le canal `source`, par lots de
+    `batch_size` messages transférés sans en-tête de transfert (aucun ré-upload).
+    Les nouveaux ids sont enregistrés dans le journal et dans msg_ids.
+    Retourne les leçons qui restent à publier normalement : absentes de la source,
+    non transférées, ou dont seule l'image a pu être copiée (audio à envoyer).
+    """
+    names = {l["base_name"] for l in lessons if not l.get("resume_msg_id")}
+    logger.log(f"🔎 Recherche des leçons dans le canal source ({len(names)} leçon(s))...")
+    found = await scan_lessons(client, source, hashtag, names)
+    logger.log(f"🧬 {len(found)} leçon(s) trouvée(s) dans le canal source.")
+
+    # Messages à copier, dans l'ordre des leçons : image puis audio
+    ids, owners = [], []
+    for lesson in lessons:
+        if lesson["base_name"] in found and not lesson.get("resume_msg_id"):
+            image_id, audio_id = found[lesson["base_name"]]
+            ids.append(image_id)
+            owners.append((lesson["base_name"], 0))
+            if audio_id and lesson["audio_path"]:
+                ids.append(audio_id)
+                owners.append((lesson["base_name"], 1))
+
+    copied = {}  # base_name -> [nouvel id image, nouvel id audio]
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        try:
+            msgs = await client.forward_messages(target, chunk, from_peer=source, drop_author=True)
+        except Exception as e:
+            # Ex. canal source protégé : les leçons restantes sont publiées normalement
+            logger.log(f"⚠️ Copie interrompue ({e}) : leçons restantes envoyées normalement.")
+            break
+        for (base_name, slot), msg in zip(owners[start:start + batch_size], msgs):
+            if msg is not None:
+                copied.setdefault(base_name, [None, None])[slot] = msg.id
+        logger.log(f"   📑 {min(start + batch_size, len(ids))}/{len(ids)} message(s) copiés.")
+
+    remaining = []
+    for lesson in lessons:
+        image_id, audio_id = copied.get(lesson["base_name"], (None, None))
+        if image_id is None:
+            if audio_id is not None:
+                logger.log(f"⚠️ {lesson['base_name']} : audio copié sans son image.")
+            remaining.append(lesson)
+            continue
+        file_hash = await asyncio.to_thread(PublishJournal.lesson_hash, lesson)
+        msg_ids[lesson["base_name"]] = image_id
+        if lesson["audio_path"] and audio_id is None:
+            journal.record(lesson, PublishJournal.IMAGE_SENT, image_id, file_hash=file_hash)
+            remaining.append(dict(lesson, resume_msg_id=image_id))
+        else:
+            journal.record(lesson, PublishJournal.SENT, image_id, audio_id, file_hash=file_hash)
+    logger.log(f"✅ {len(copied)} leçon(s) copiée(s) sans ré-upload, {len(remaining)} à envoyer.")
+    return remaining
@@ -0,0 +1,180 @@
+import os
+import re
+import json
+import hashlib
+import unicodedata
+
+def extraire_numero(base_name):
+    # Chercher à la fin : un ou plusieurs groupes de chiffres séparés par _ ou -
+    match = re.search(r'(\d+(?:[_\-]\d+)*)$', base_name)
+    if match:
+        return match.group(1).replace("-", "_")
+    return base_name
+
+def normalize_name(text):
+    # Supprime les accents et remplace les caractères non alphanumériques par _
+    text = unicodedata.normalize("NFD", text)
+    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+    text = re.sub(r'\W+', '_', text)
+    text = re.sub(r'_+', '_', text)
+    return text.strip('_').lower()
+
+_digest_memo = {}  # (chemin, taille, date) -> empreinte, pour ne lire chaque fichier qu'une fois
+
+def file_digest(path, chunk_size=1024 * 1024):
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key in _digest_memo:
+        return _digest_memo[key]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    _digest_memo[key] = h.hexdigest()
+    return _digest_memo[key]
+
+def list_books(books_dir):
+    """Sous-dossiers du dossier des livres (un cours par sous-dossier), triés."""
+    return sorted([name for name in os.listdir(books_dir) if os.path.isdir(os.path.join(books_dir, name))])
+
+def list_lessons(images_dir, audios_dir):
+    """
+    Liste ordonnée des leçons d'un cours : une image par leçon,
+    avec l'audio du même nom s'il existe (et la taille des fichiers).
+    """
+    if not os.path.isdir(images_dir):
+        return []
+    audios = {}
+    if os.path.isdir(audios_dir):
+        audios = {entry.name: entry for entry in os.scandir(audios_dir) if entry.is_file()}
+    images = sorted(
+        (entry for entry in os.scandir(images_dir) if entry.name.lower().endswith(('.jpg', '.png'))),
+        key=lambda entry: entry.name
+    )
+    lessons = []
+    for img in images:
+        base_name = os.path.splitext(img.name)[0]
+        audio = audios.get(base_name + ".mp3")
+        lessons.append({
+            "img_name": img.name,
+            "base_name": base_name,
+            "img_path": img.path,
+            "img_size": img.stat().st_size,
+            "audio_path": audio.path if audio else None,
+            "audio_size": audio.stat().st_size if audio else 0,
+        })
+    return lessons
+
+def course_bytes(book_path):
+    return CourseIndex.get(book_path).total_bytes
+
+def read_course_config(book_path, logger=None):
+    """Retourne (nomArabe, nomLatin) depuis config/config.json du cours."""
+    config_file = os.path.join(book_path, "config", "config.json")
+    nom_arabe = ""
+    nom_latin = ""
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, "r", encoding="utf-8") as f:
+                config = json.load(f)
+                nom_arabe = config.get("nomArabe", "")
+                nom_latin = config.get("nomLatin", "")
+        except Exception as e:
+            if logger:
+                logger.log(f"⚠️ Erreur lecture config.json : {e}")
+    return nom_arabe, nom_latin
+
+def build_channel_title(book_title, nom_arabe, nom_latin):
+    if nom_arabe:
+        return f"{nom_latin if nom_latin else book_title} - {nom_arabe} (Majàlisur Rahmàn)"
+    return f"{nom_latin if nom_latin else book_title} (Majàlisur Rahmàn)"
+
+def normalize_hashtag(text):
+    """Retourne (hashtag, nom affiché) : "dars" → ("#dars", "Dars")."""
+    hashtag = text.strip()
+    hashtag_nom = ""
+    if not hashtag.startswith("#") and hashtag not in ["", "none"]:
+        hashtag = f"#{hashtag}"
+    # Normaliser le hashtag pour l'affichage
+    if hashtag not in ["", "none"]:
+        hashtag_nom = hashtag.lstrip("#").capitalize()
+    return hashtag, hashtag_nom
+
+def build_publish_job(books_dir, book_name, hashtag_text, channel_link=None, main_channel_id="",
+                      channel_photo_path=None, logger=None, albums=False, preprocess=False, clone_from=None,
+                      reconcile=None):
+    """Paramètres de publication d'un cours, indépendants de l'interface."""
+    book_title = book_name.strip()
+    book_path = os.path.join(books_dir, book_name)
+    course = CourseIndex.get(book_path, logger)
+    nom_arabe, nom_latin = course.nom_arabe, course.nom_latin
+    hashtag, hashtag_nom = normalize_hashtag(hashtag_text)
+    return {
+        "book_name": book_name,
+        "book_path": book_path,
+        "channel_title": build_channel_title(book_title, nom_arabe, nom_latin),
+        "channel_link": channel_link,
+        "username": normalize_name(f"mr_{book_name}"),
+        "hashtag": hashtag,
+        "hashtag_nom": hashtag_nom,
+        "main_channel_id": (main_channel_id or "").strip(),
+        "channel_photo_path": channel_photo_path,
+        "nom_arabe": nom_arabe,
+        "nom_latin": nom_latin,
+        "albums": albums,  # images sans audio consécutives groupées en albums
+        "preprocess": preprocess,  # images allégées (Pillow) avant envoi
+        "clone_from": clone_from,  # canal source dont les leçons sont copiées au lieu d'être ré-envoyées
+        "reconcile": reconcile,  # "resume" ou "full" : journal reconstruit depuis l'historique du canal
+    }
+
+# === Index d'un cours : construit une fois, invalidé par la date des dossiers ===
+class CourseIndex:
+    """
+    Leçons triées (appariement image/audio, tailles) et configuration d'un cours,
+    partagés par l'interface et le publieur. L'index est reconstruit seulement
+    quand la date de modification de images/, audios/ ou config.json change
+    (ajout, suppression ou renommage de fichiers).
+    """
+
+    _cache = {}  # chemin absolu du cours -> CourseIndex
+
+    def __init__(self, book_path, logger=None):
+        self.book_path = book_path
+        self.images_dir = os.path.join(book_path, "images")
+        self.audios_dir = os.path.join(book_path, "audios")
+        self.config_file = os.path.join(book_path, "config", "config.json")
+        self.stamp = self._stamp()
+        self.nom_arabe, self.nom_latin = read_course_config(book_path, logger)
+        self.lessons = list_lessons(self.images_dir, self.audios_dir)
+        self.total_bytes = sum(l["img_size"] + l["audio_size"] for l in self.lessons)
+
+    @classmethod
+    def get(cls, book_path, logger=None):
+        key = os.path.abspath(book_path)
+        index = cls._cache.get(key)
+        if index is None or not index.is_fresh():
+            index = cls(book_path, logger)
+            cls._cache[key] = index
+        return index
+
+    @classmethod
+    def invalidate(cls, book_path=None):
+        if book_path is None:
+            cls._cache.clear()
+        else:
+            cls._cache.pop(os.path.abspath(book_path), None)
+
+    def _stamp(self):
+        stamp = []
+        for path in (self.images_dir, self.audios_dir, self.config_file):
+            try:
+                stamp.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def is_fresh(self):
+        return self._stamp() == self.stamp
+
+    def __len__(self):
+        return len(self.lessons)
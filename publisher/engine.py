@@ -0,0 +1,208 @@
+import os
+import time
+import asyncio
+from contextlib import nullcontext
+
+from telethon.errors import FileReferenceExpiredError
+from telethon.tl.functions.messages import UploadMediaRequest
+from telethon.tl.types import InputPhoto, InputDocument, InputMediaUploadedPhoto
+
+from .settings import UPLOAD_CONCURRENCY
+from .course import file_digest
+
+# === Moteur d'envoi : pré-upload parallèle, publication dans l'ordre ===
+class UploadEngine:
+    """
+    Pré-envoie les fichiers des leçons via client.upload_file, plusieurs à la fois
+    (limite de concurrence), tandis que les messages sont publiés dans l'ordre strict
+    des leçons par l'appelant. Avec un MediaCache, un contenu déjà envoyé par ce
+    compte est réutilisé sans être ré-uploadé ; avec un ImagePreprocessor, ce sont
+    les versions allégées des images qui sont envoyées. Avec un PublishMetrics, chaque
+    envoi de fichier et chaque publication est chronométré. Avec un ParallelUploader,
+    les gros fichiers sont envoyés par morceaux sur plusieurs connexions. Avec un
+    AudioIndex, les audios sont publiés avec leurs attributs (durée, titre, interprète).
+    """
+
+    def __init__(self, client, concurrency=UPLOAD_CONCURRENCY, logger=None, cache=None, preprocessor=None,
+                 metrics=None, uploader=None, audio_index=None):
+        self.client = client
+        self.concurrency = max(1, int(concurrency))
+        self.logger = logger
+        self.cache = cache
+        self.preprocessor = preprocessor
+        self.metrics = metrics
+        self.uploader = uploader
+        self.audio_index = audio_index
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._digests = {}  # chemin -> empreinte (si cache actif)
+        self._sources = {}  # chemin de la leçon -> fichier réellement envoyé
+        self.bytes_sent = 0
+        self.bytes_reused = 0
+        self.lessons_done = 0
+        self.started_at = None
+
+    def _span(self, phase):
+        return self.metrics.span(phase) if self.metrics else nullcontext()
+
+    async def _upload_file(self, path, phase):
+        async with self._semaphore:
+            with self._span(phase) as span:
+                size = os.path.getsize(path)
+                if self.uploader and self.uploader.wants(size):
+                    handle = await self.uploader.upload(path)
+                else:
+                    handle = await self.client.upload_file(path)
+                if span:
+                    span.bytes = size
+        self.bytes_sent += size
+        return handle
+
+    async def upload(self, path, phase="upload_audio"):
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        if self.cache:
+            digest = await asyncio.to_thread(file_digest, path)
+            self._digests[path] = digest
+            cached = self.cache.get(digest)
+            if cached:
+                self.bytes_reused += os.path.getsize(path)
+                return cached
+        return await self._upload_file(path, phase)
+
+    async def send(self, entity, path, handle, **kwargs):
+        """
+        Publie un fichier pré-envoyé (ou une référence du cache) et mémorise le média obtenu.
+        Une file_reference expirée est rafraîchie automatiquement, sinon le fichier est ré-uploadé.
+        """
+        path = self._sources.get(path, path)
+        digest = self._digests.get(path)
+        if self.audio_index and path.lower().endswith(".mp3") and "attributes" not in kwargs:
+            # Métadonnées calculées à l'avance par le pool : Telethon n'analyse rien à l'envoi
+            attributes = await self.audio_index.attributes(path)
+            if attributes:
+                kwargs["attributes"] = attributes
+        try:
+            with self._span("send"):
+                msg = await self.client.send_file(entity, handle, **kwargs)
+        except FileReferenceExpiredError:
+            return await self._resend(entity, path, digest, **kwargs)
+        if self.cache and digest and not isinstance(handle, (InputPhoto, InputDocument)):
+            self.cache.store(digest, msg, os.path.getsize(path))
+        return msg
+
+    async def _album_photo(self, entity, handle):
+        """
+        Photo Telegram (InputPhoto) pour un fichier pré-envoyé : un album n'accepte que des
+        médias déjà créés. Fait ici plutôt que dans send_file, où Telethon enverrait une requête
+        messages.uploadMedia par image sans passer par le planificateur.
+        """
+        if isinstance(handle, (InputPhoto, InputDocument)):
+            return handle  # référence du cache : rien à créer
+        with self._span("upload_media"):
+            result = await self.client(UploadMediaRequest(entity, InputMediaUploadedPhoto(handle)))
+        photo = result.photo
+        return InputPhoto(id=photo.id, access_hash=photo.access_hash, file_reference=photo.file_reference)
+
+    async def send_album(self, entity, paths, handles, captions):
+        """
+        Publie plusieurs images pré-envoyées en un seul album (une légende par image).
+        Coût : une requête messages.uploadMedia par image pas encore connue de Telegram
+        (en parallèle, via le planificateur), puis un seul envoi pour tout l'album.
+        Retourne un message par image, dans l'ordre.
+        """
+        paths = [self._sources.get(p, p) for p in paths]
+        media = await asyncio.gather(*(self._album_photo(entity, h) for h in handles))
+        try:
+            with self._span("send"):
+                msgs = await self.client.send_file(entity, list(media), caption=captions)
+        except FileReferenceExpiredError:
+            # Une référence du cache a expiré : envoi image par image (send la rafraîchit)
+            return [await self.send(entity, p, h, caption=c) for p, h, c in zip(paths, handles, captions)]
+        for path, handle, msg in zip(paths, handles, msgs):
+            digest = self._digests.get(path)
+            if self.cache and digest and not isinstance(handle, (InputPhoto, InputDocument)):
+                self.cache.store(digest, msg, os.path.getsize(path))
+        return msgs
+
+    async def _resend(self, entity, path, digest, **kwargs):
+        # 1) Référence rafraîchie depuis le message source
+        if self.cache and digest:
+            handle = await self.cache.refresh(self.client, digest)
+            if handle is not None:
+                try:
+                    return await self.client.send_file(entity, handle, **kwargs)
+                except FileReferenceExpiredError:
+                    self.cache.evict(digest)
+        # 2) Sinon, nouvel envoi du fichier
+        handle = await self._upload_file(path, "reupload")
+        with self._span("send"):
+            msg = await self.client.send_file(entity, handle, **kwargs)
+        if self.cache and digest:
+            self.cache.store(digest, msg, os.path.getsize(path))
+        return msg
+
+    async def _upload_image(self, path):
+        if self.preprocessor:
+            self._sources[path] = await self.preprocessor.get(path)
+        return await self.upload(self._sources.get(path, path), "upload_image")
+
+    async def _prepare(self, lesson):
+        image_task = audio_task = None
+        if not lesson.get("resume_msg_id"):
+            image_task = asyncio.ensure_future(self._upload_image(lesson["img_path"]))
+        if lesson["audio_path"]:
+            audio_task = asyncio.ensure_future(self.upload(lesson["audio_path"]))
+        try:
+            image = await image_task if image_task else None
+            audio = await audio_task if audio_task else None
+        except BaseException:
+            for task in (image_task, audio_task):
+                if task and not task.done():
+                    task.cancel()
+            raise
+        return image, audio
+
+    async def stream(self, lessons):
+        """
+        Générateur asynchrone : produit (leçon, (image, audio), erreur) dans l'ordre des leçons.
+        Les envois des leçons suivantes tournent en arrière-plan (fenêtre d'avance limitée).
+        """
+        window = self.concurrency * 2
+        tasks = {}
+        try:
+            for i, lesson in enumerate(lessons):
+                for j in range(i, min(i + window, len(lessons))):
+                    if j not in tasks:
+                        tasks[j] = asyncio.ensure_future(self._prepare(lessons[j]))
+                task = tasks.pop(i)
+                try:
+                    handles = await task
+                    error = None
+                except Exception as e:
+                    handles, error = (None, None), e
+                yield lesson, handles, error
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    def lesson_done(self):
+        self.lessons_done += 1
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "lessons": self.lessons_done,
+            "bytes": self.bytes_sent,
+            "seconds": round(elapsed, 2),
+            "lessons_per_min": round(self.lessons_done * 60 / elapsed, 2) if elapsed else 0.0,
+            "mb_per_s": round(self.bytes_sent / (1024 * 1024) / elapsed, 2) if elapsed else 0.0,
+            "bytes_reused": self.bytes_reused,
+        }
+
+    def report(self):
+        s = self.stats()
+        report = (f"📊 Débit : {s['lessons_per_min']} leçons/min, {s['mb_per_s']} Mo/s "
+                  f"({s['lessons']} leçons, {s['bytes'] / (1024 * 1024):.1f} Mo en {s['seconds']} s)")
+        if s["bytes_reused"]:
+            report += f", {s['bytes_reused'] / (1024 * 1024):.1f} Mo réutilisés depuis le cache"
+        return report
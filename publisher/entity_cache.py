@@ -0,0 +1,69 @@
+import os
+import time
+import sqlite3
+
+from telethon.tl.types import InputPeerChannel
+
+from .settings import SESSIONS_DIR, ENTITY_CACHE_TTL
+
+# === Cache des entités et liens de canaux résolus ===
+class EntityCache:
+    """
+    Associe un lien, un nom d'utilisateur ou un titre de canal à l'entité résolue
+    (id, access_hash) et à son lien public ou privé. Un cache par session (les
+    access_hash sont propres au compte), stocké dans ~/.telegram_sessions, avec TTL :
+    une publication répétée ne refait aucune résolution réseau tant qu'il est valide.
+    """
+
+    def __init__(self, path, ttl=ENTITY_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entities ("
+            " key TEXT PRIMARY KEY, entity_id INTEGER, access_hash INTEGER,"
+            " title TEXT, link TEXT, resolved_at REAL)"
+        )
+        self.conn.commit()
+
+    @classmethod
+    def for_account(cls, api_name):
+        return cls(os.path.join(SESSIONS_DIR, f"entities_{api_name}.sqlite"))
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, key):
+        row = self.conn.execute(
+            "SELECT entity_id, access_hash, title, link, resolved_at FROM entities WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        if time.time() - row[4] > self.ttl:
+            self.invalidate(key)
+            return None
+        return dict(zip(("id", "access_hash", "title", "link"), row[:4]))
+
+    def put(self, key, entity, link):
+        info = {"id": entity.id, "access_hash": entity.access_hash, "title": getattr(entity, "title", ""), "link": link}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entities (key, entity_id, access_hash, title, link, resolved_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (key, info["id"], info["access_hash"], info["title"], link, time.time())
+        )
+        self.conn.commit()
+        return info
+
+    def invalidate(self, key):
+        self.conn.execute("DELETE FROM entities WHERE key = ?", (key,))
+        self.conn.commit()
+
+    def invalidate_id(self, entity_id):
+        self.conn.execute("DELETE FROM entities WHERE entity_id = ?", (entity_id,))
+        self.conn.commit()
+
+    @staticmethod
+    def input_peer(info):
+        """Pair utilisable directement par send_file / send_message, sans résolution réseau."""
+        return InputPeerChannel(channel_id=info["id"], access_hash=info["access_hash"])
@@ -0,0 +1,135 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, BrokenExecutor
+
+from .settings import IMAGE_CACHE_DIR, IMAGE_MAX_SIDE, IMAGE_JPEG_QUALITY, PNG_TO_JPEG_MIN_BYTES
+from .course import file_digest
+
+def prepare_image(path, cache_dir=IMAGE_CACHE_DIR, max_side=IMAGE_MAX_SIDE,
+                  quality=IMAGE_JPEG_QUALITY, png_min_bytes=PNG_TO_JPEG_MIN_BYTES):
+    """
+    Version allégée d'une image de leçon (exécutée dans un processus du pool) :
+    réduite à la dimension maximale des photos Telegram, les gros PNG convertis en JPEG.
+    Le résultat est rangé dans cache_dir sous l'empreinte du fichier source ; retourne
+    le chemin à envoyer (l'original si le traitement n'apporte rien).
+    """
+    from PIL import Image, ImageOps
+
+    size = os.path.getsize(path)
+    key = f"{file_digest(path)}_{max_side}_{quality}"
+    for ext in (".jpg", ".png"):
+        cached = os.path.join(cache_dir, key + ext)
+        if os.path.exists(cached):
+            return cached
+    if os.path.exists(os.path.join(cache_dir, key + ".orig")):
+        return path
+
+    with Image.open(path) as im:
+        is_png = im.format == "PNG"
+        resize = max(im.size) > max_side
+        to_jpeg = is_png and size >= png_min_bytes
+        if not resize and not to_jpeg:
+            out, result = os.path.join(cache_dir, key + ".orig"), None
+        else:
+            result = ImageOps.exif_transpose(im)
+            if resize:
+                result.thumbnail((max_side, max_side), Image.LANCZOS)
+            ext = ".jpg" if to_jpeg or not is_png else ".png"
+            out = os.path.join(cache_dir, key + ext)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    if result is None:
+        # Marqueur : rien à gagner sur ce fichier, inutile de le rouvrir la prochaine fois
+        open(tmp, "wb").close()
+        os.replace(tmp, out)
+        return path
+
+    if out.endswith(".jpg"):
+        if result.mode in ("RGBA", "LA", "P"):
+            rgba = result.convert("RGBA")
+            result = Image.new("RGB", rgba.size, (255, 255, 255))
+            result.paste(rgba, mask=rgba.split()[-1])
+        elif result.mode != "RGB":
+            result = result.convert("RGB")
+        result.save(tmp, "JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        result.save(tmp, "PNG", optimize=True)
+
+    if os.path.getsize(tmp) >= size:
+        os.remove(tmp)
+        open(out.rsplit(".", 1)[0] + ".orig", "wb").close()
+        return path
+    os.replace(tmp, out)
+    return out
+
+class ImagePreprocessor:
+    """
+    Étape optionnelle en amont du moteur d'envoi : toutes les images du cours sont
+    soumises d'emblée à un pool de processus, et le moteur consomme chaque version
+    allégée dès qu'elle est prête, pendant que les leçons suivantes sont traitées.
+    Nécessite Pillow.
+    """
+
+    def __init__(self, workers=None, cache_dir=IMAGE_CACHE_DIR, logger=None):
+        self.cache_dir = cache_dir
+        self.logger = logger
+        # "spawn" : pas de fork d'un processus multi-thread (Qt, asyncio)
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.futures = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.fallbacks = 0
+        self.broken = False
+
+    @staticmethod
+    def available():
+        try:
+            import PIL  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def start(self, paths):
+        loop = asyncio.get_running_loop()
+        for path in paths:
+            if path not in self.futures:
+                self.futures[path] = loop.run_in_executor(self.executor, prepare_image, path, self.cache_dir)
+
+    async def get(self, path):
+        """Chemin à envoyer pour cette image (version allégée, ou l'original en cas d'échec)."""
+        if path not in self.futures:
+            self.start([path])
+        try:
+            prepared = await self.futures[path]
+        except BrokenExecutor as e:
+            # Pool hors service (processus de travail morts) : signalé une fois, pas image par image
+            if self.logger and not self.broken:
+                self.logger.log(f"⚠️ Pool d'optimisation des images hors service ({e}) : "
+                                f"les images originales sont envoyées sans optimisation.")
+            self.broken = True
+            self.fallbacks += 1
+            prepared = path
+        except Exception as e:
+            if self.logger:
+                self.logger.log(f"⚠️ Optimisation impossible pour {os.path.basename(path)} : {e}")
+            self.fallbacks += 1
+            prepared = path
+        self.bytes_in += os.path.getsize(path)
+        self.bytes_out += os.path.getsize(prepared)
+        return prepared
+
+    def report(self):
+        saved = self.bytes_in - self.bytes_out
+        ratio = 100 * saved / self.bytes_in if self.bytes_in else 0
+        text = (f"🗜️ Images optimisées : {self.bytes_in / (1024 * 1024):.1f} Mo → "
+                f"{self.bytes_out / (1024 * 1024):.1f} Mo ({ratio:.0f} % économisés)")
+        if self.fallbacks:
+            text += f" — ⚠️ {self.fallbacks} image(s) envoyée(s) sans optimisation"
+        return text
+
+    def shutdown(self):
+        for future in self.futures.values():
+            future.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from .settings import SESSIONS_DIR
+
+# === File de publication persistante (plusieurs livres, priorités) ===
+class JobQueue:
+    """
+    File SQLite des cours à publier, stockée dans ~/.telegram_sessions : chaque job
+    (un livre pour un compte) a une priorité, un état et une progression, et survit
+    au redémarrage de l'application. Partagée entre le thread de l'interface et la
+    boucle du service Telegram (accès protégés par un verrou).
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    COLUMNS = ("id", "account", "book_name", "job", "priority", "state", "done", "total",
+               "error", "created_at", "updated_at")
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(SESSIONS_DIR, "publish_queue.sqlite")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, account TEXT, book_name TEXT, job TEXT,"
+            " priority INTEGER DEFAULT 0, state TEXT, done INTEGER DEFAULT 0, total INTEGER DEFAULT 0,"
+            " error TEXT, created_at REAL, updated_at REAL)"
+        )
+        # Jobs interrompus par un arrêt de l'application : repris au prochain lancement
+        self.conn.execute("UPDATE jobs SET state = ? WHERE state = ?", (self.PENDING, self.RUNNING))
+        self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _row(self, row):
+        job = dict(zip(self.COLUMNS, row))
+        job["job"] = json.loads(job["job"])
+        return job
+
+    def _set(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        with self._lock:
+            self.conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                (*fields.values(), job_id)
+            )
+            self.conn.commit()
+
+    # --- Ajout et consultation
+    # Résultats de add()
+    ADDED = "added"          # nouveau job en attente
+    UPDATED = "updated"      # job en attente (ou en échec) du même livre mis à jour
+    FOLLOW_UP = "follow_up"  # livre en cours de publication : nouveaux paramètres publiés ensuite
+    UNCHANGED = "unchanged"  # livre en cours de publication avec les mêmes paramètres : rien à faire
+
+    def add(self, account, job, priority=0):
+        """
+        Ajoute un cours à la file ; un job en attente du même livre pour ce compte est
+        mis à jour (paramètres, priorité) plutôt que dupliqué. Si le livre est en cours
+        de publication, des paramètres différents donnent un job de suite, lancé après
+        celui en cours (jamais en même temps). Retourne (id du job, résultat).
+        """
+        now = time.time()
+        data = json.dumps(job)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, state, job FROM jobs WHERE account = ? AND book_name = ? AND state != ?"
+                " ORDER BY state = ?", (account, job["book_name"], self.DONE, self.RUNNING)
+            ).fetchall()
+            waiting = next((r for r in rows if r[1] != self.RUNNING), None)
+            running = next((r for r in rows if r[1] == self.RUNNING), None)
+            if waiting:
+                job_id, result = waiting[0], self.UPDATED
+                self.conn.execute(
+                    "UPDATE jobs SET job = ?, priority = ?, state = ?, error = NULL, updated_at = ? WHERE id = ?",
+                    (data, priority, self.PENDING, now, job_id)
+                )
+            elif running and running[2] == data:
+                return running[0], self.UNCHANGED
+            else:
+                result = self.FOLLOW_UP if running else self.ADDED
+                job_id = self.conn.execute(
+                    "INSERT INTO jobs (account, book_name, job, priority, state, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (account, job["book_name"], data, priority, self.PENDING, now, now)
+                ).lastrowid
+            self.conn.commit()
+        return job_id, result
+
+    def jobs(self):
+        """Tous les jobs, dans l'ordre où ils seront lancés (terminés en dernier)."""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs"
+                " ORDER BY state = ?, priority DESC, id", (self.DONE,)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def pending_count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (self.PENDING,)).fetchone()[0]
+
+    # --- Exécution
+    def claim(self):
+        """
+        Prend le job en attente le plus prioritaire (le plus ancien à égalité) et le marque
+        en cours ; un livre déjà en cours de publication pour ce compte attend son tour.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs AS j WHERE state = ? AND NOT EXISTS ("
+                " SELECT 1 FROM jobs AS r WHERE r.state = ? AND r.account = j.account AND r.book_name = j.book_name)"
+                " ORDER BY priority DESC, id LIMIT 1", (self.PENDING, self.RUNNING)
+            ).fetchone()
+            if not row:
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (self.RUNNING, time.time(), row[0])
+            )
+            self.conn.commit()
+        job = self._row(row)
+        job["state"] = self.RUNNING
+        return job
+
+    def progress(self, job_id, done, total):
+        self._set(job_id, done=done, total=total)
+
+    def finish(self, job_id, error=None):
+        if error is None:
+            self._set(job_id, state=self.DONE, error=None)
+        else:
+            self._set(job_id, state=self.FAILED, error=str(error))
+
+    # --- Gestion depuis l'interface
+    def set_priority(self, job_id, priority):
+        self._set(job_id, priority=priority)
+
+    def retry(self, job_id):
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, error = NULL, updated_at = ? WHERE id = ? AND state IN (?, ?)",
+                (self.PENDING, time.time(), job_id, self.FAILED, self.DONE)
+            )
+            self.conn.commit()
+
+    def remove(self, job_id):
+        """Retire un job de la file (sauf s'il est en cours)."""
+        with self._lock:
+            removed = self.conn.execute(
+                "DELETE FROM jobs WHERE id = ? AND state != ?", (job_id, self.RUNNING)
+            ).rowcount
+            self.conn.commit()
+        return bool(removed)
+
+    def clear_done(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM jobs WHERE state = ?", (self.DONE,))
+            self.conn.commit()
@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import sqlite3
+
+from .settings import SESSIONS_DIR
+from .course import file_digest, normalize_name
+
+# === Journal de publication (reprise après interruption) ===
+class PublishJournal:
+    """
+    Journal SQLite par cours, stocké à côté des sessions dans ~/.telegram_sessions.
+    Chaque leçon y est enregistrée au fil de l'envoi (empreinte des fichiers, id du
+    message, statut) : une nouvelle publication saute les leçons déjà envoyées et
+    reconstruit le menu à partir du journal.
+    """
+
+    IMAGE_SENT = "image_sent"  # image publiée, audio encore à envoyer
+    SENT = "sent"
+    FAILED = "failed"
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS lessons ("
+            " base_name TEXT PRIMARY KEY, stamp TEXT, file_hash TEXT,"
+            " msg_id INTEGER, audio_msg_id INTEGER, status TEXT, error TEXT, updated_at REAL)"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+    @staticmethod
+    def path_for(api_name, book_name):
+        return os.path.join(SESSIONS_DIR, f"journal_{api_name}_{normalize_name(book_name)}.sqlite")
+
+    @classmethod
+    def for_course(cls, api_name, book_name):
+        return cls(cls.path_for(api_name, book_name))
+
+    def close(self):
+        self.conn.close()
+
+    # --- Métadonnées (canal, menus publiés...)
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+        self.conn.commit()
+
+    def bind_channel(self, channel_id):
+        """Associe le journal au canal ; s'il s'agit d'un autre canal, le journal est remis à zéro."""
+        known = self.get_meta("channel_id")
+        if known is not None and known != channel_id:
+            self.conn.execute("DELETE FROM lessons")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.commit()
+            known = None
+        if known is None:
+            self.set_meta("channel_id", channel_id)
+            return False
+        return True
+
+    # --- Leçons
+    @staticmethod
+    def lesson_stamp(lesson):
+        parts = []
+        for path in (lesson["img_path"], lesson["audio_path"]):
+            if path:
+                st = os.stat(path)
+                parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+        return "|".join(parts)
+
+    @staticmethod
+    def lesson_hash(lesson):
+        return ":".join(file_digest(p) for p in (lesson["img_path"], lesson["audio_path"]) if p)
+
+    def get(self, base_name):
+        row = self.conn.execute(
+            "SELECT stamp, file_hash, msg_id, audio_msg_id, status FROM lessons WHERE base_name = ?",
+            (base_name,)
+        ).fetchone()
+        if not row:
+            return None
+        return dict(zip(("stamp", "file_hash", "msg_id", "audio_msg_id", "status"), row))
+
+    def state(self, lesson):
+        """
+        Statut d'une leçon déjà journalisée, si ses fichiers n'ont pas changé depuis
+        (comparaison taille/date, puis empreinte si nécessaire) ; sinon None.
+        """
+        row = self.get(lesson["base_name"])
+        if not row or row["status"] not in (self.SENT, self.IMAGE_SENT):
+            return None
+        stamp = self.lesson_stamp(lesson)
+        if row["stamp"] != stamp:
+            if row["file_hash"] != self.lesson_hash(lesson):
+                return None
+            self.conn.execute("UPDATE lessons SET stamp = ? WHERE base_name = ?", (stamp, lesson["base_name"]))
+            self.conn.commit()
+        return row
+
+    def forget(self, base_names):
+        """Retire des leçons du journal (ex. absentes du canal) : elles seront republiées."""
+        self.conn.executemany("DELETE FROM lessons WHERE base_name = ?", [(n,) for n in base_names])
+        self.conn.commit()
+
+    def sent_names(self):
+        rows = self.conn.execute(
+            "SELECT base_name FROM lessons WHERE status IN (?, ?)", (self.SENT, self.IMAGE_SENT)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def record(self, lesson, status, msg_id=None, audio_msg_id=None, error=None, file_hash=None):
+        if file_hash is None and status != self.FAILED:
+            file_hash = self.lesson_hash(lesson)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO lessons"
+            " (base_name, stamp, file_hash, msg_id, audio_msg_id, status, error, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (lesson["base_name"], self.lesson_stamp(lesson), file_hash, msg_id, audio_msg_id,
+             status, error, time.time())
+        )
+        self.conn.commit()
@@ -0,0 +1,56 @@
+import os
+import json
+import time
+import threading
+
+from .settings import LOG_DIR
+
+def log_level(text):
+    """Niveau déduit du pictogramme en tête de ligne (convention des messages du projet)."""
+    text = text.lstrip()
+    if text.startswith("❌"):
+        return "error"
+    if text.startswith("⚠️"):
+        return "warning"
+    return "info"
+
+# === Journal structuré sur disque (analyse après coup) ===
+class JsonlLogSink:
+    """
+    Écrit chaque ligne de log comme un objet JSON par ligne (ts, level, source, text).
+    Utilisable depuis n'importe quel thread ; les écritures sont mises en tampon et
+    vidées sur disque par flush() (appelé par lots, pas à chaque ligne).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.lock = threading.Lock()
+
+    @classmethod
+    def for_session(cls, name):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return cls(os.path.join(LOG_DIR, f"{name}_{stamp}_{os.getpid()}.jsonl"))
+
+    def write(self, text, source="app", ts=None):
+        event = {
+            "ts": round(ts if ts is not None else time.time(), 3),
+            "level": log_level(text),
+            "source": source,
+            "text": text,
+        }
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self.lock:
+            if not self.file.closed:
+                self.file.write(line)
+
+    def flush(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
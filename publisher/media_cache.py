@@ -0,0 +1,106 @@
+import os
+import time
+import sqlite3
+
+from telethon.tl.types import InputPhoto, InputDocument
+
+from .settings import SESSIONS_DIR, MEDIA_CACHE_MAX_ENTRIES, MEDIA_CACHE_MAX_AGE_DAYS
+
+# === Cache des médias envoyés, indexé par empreinte du contenu ===
+class MediaCache:
+    """
+    Associe l'empreinte SHA-256 d'un fichier à la référence Telegram du média obtenu
+    lors du premier envoi (photo/document : id, access_hash, file_reference), ainsi
+    qu'au message source pour rafraîchir une file_reference expirée.
+    Un cache par compte (les références ne sont valables que pour ce compte).
+    """
+
+    def __init__(self, path, max_entries=MEDIA_CACHE_MAX_ENTRIES, max_age_days=MEDIA_CACHE_MAX_AGE_DAYS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS media ("
+            " digest TEXT PRIMARY KEY, kind TEXT, media_id INTEGER, access_hash INTEGER,"
+            " file_reference BLOB, chat_id INTEGER, msg_id INTEGER, size INTEGER,"
+            " created_at REAL, last_used REAL)"
+        )
+        self.conn.commit()
+        self.prune()
+
+    @classmethod
+    def for_account(cls, api_name):
+        return cls(os.path.join(SESSIONS_DIR, f"media_cache_{api_name}.sqlite"))
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, digest):
+        """Référence réutilisable (InputPhoto / InputDocument) pour ce contenu, ou None."""
+        row = self.conn.execute(
+            "SELECT kind, media_id, access_hash, file_reference, created_at FROM media WHERE digest = ?",
+            (digest,)
+        ).fetchone()
+        if not row:
+            return None
+        kind, media_id, access_hash, file_reference, created_at = row
+        if time.time() - created_at > self.max_age:
+            self.evict(digest)
+            return None
+        self.conn.execute("UPDATE media SET last_used = ? WHERE digest = ?", (time.time(), digest))
+        self.conn.commit()
+        cls = InputPhoto if kind == "photo" else InputDocument
+        return cls(id=media_id, access_hash=access_hash, file_reference=file_reference)
+
+    def store(self, digest, msg, size=0):
+        if msg.photo:
+            kind, media = "photo", msg.photo
+        elif msg.document:
+            kind, media = "document", msg.document
+        else:
+            return
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO media"
+            " (digest, kind, media_id, access_hash, file_reference, chat_id, msg_id, size, created_at, last_used)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (digest, kind, media.id, media.access_hash, media.file_reference,
+             msg.chat_id, msg.id, size, now, now)
+        )
+        self.conn.commit()
+        self.prune()
+
+    def source(self, digest):
+        return self.conn.execute("SELECT chat_id, msg_id, size FROM media WHERE digest = ?", (digest,)).fetchone()
+
+    async def refresh(self, client, digest):
+        """Recharge le message source pour obtenir une file_reference à jour."""
+        row = self.source(digest)
+        if not row:
+            return None
+        chat_id, msg_id, size = row
+        try:
+            msg = await client.get_messages(chat_id, ids=msg_id)
+        except Exception:
+            msg = None
+        if not msg or not (msg.photo or msg.document):
+            self.evict(digest)
+            return None
+        self.store(digest, msg, size)
+        return self.get(digest)
+
+    def evict(self, digest):
+        self.conn.execute("DELETE FROM media WHERE digest = ?", (digest,))
+        self.conn.commit()
+
+    def prune(self):
+        """Éviction : entrées trop anciennes, puis les moins récemment utilisées au-delà de max_entries."""
+        self.conn.execute("DELETE FROM media WHERE created_at < ?", (time.time() - self.max_age,))
+        self.conn.execute(
+            "DELETE FROM media WHERE digest NOT IN"
+            " (SELECT digest FROM media ORDER BY last_used DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self.conn.commit()
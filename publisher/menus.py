@@ -0,0 +1,208 @@
+import os
+import json
+import asyncio
+import sqlite3
+from html.parser import HTMLParser
+
+from .settings import SESSIONS_DIR, MESSAGE_MAX_LENGTH, MESSAGE_MAX_LINKS
+from .course import extraire_numero
+
+def utf16_len(text):
+    """Longueur d'un texte telle que Telegram la compte (unités UTF-16)."""
+    return len(text.encode("utf-16-le")) // 2
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+def visible_text(html_text):
+    """Texte d'un message HTML tel que Telegram le compte (balises retirées, entités décodées)."""
+    parser = _TextExtractor()
+    parser.feed(html_text)
+    parser.close()
+    return "".join(parser.parts)
+
+# === Lignes des menus ===
+BACK_LABEL = "⬅ Retour au Programme Principal"
+
+def lesson_menu_intro(hashtag_nom):
+    return f"<b>📘 Menu des {hashtag_nom} (Leçons)</b>"
+
+def lesson_menu_back(main_channel_link):
+    # Lien vers le canal du menu principal, toujours en dernier message du menu
+    return f"<b><a href='{main_channel_link}'>{BACK_LABEL}</a></b>"
+
+def lesson_menu_markers(hashtag_nom):
+    """Débuts du texte visible des messages du menu des leçons (repérage dans l'historique)."""
+    return (visible_text(lesson_menu_intro(hashtag_nom)), BACK_LABEL)
+
+def lesson_menu_line(channel_link_prefix, msg_id, hashtag_nom, base_name):
+    # 📌 Lien vers le message, 🧠 numéro extrait du nom de la leçon
+    return f"👉 <a href='{channel_link_prefix}/{msg_id}'>{hashtag_nom} {extraire_numero(base_name)}</a>"
+
+def main_menu_line(job, channel_link_prefix):
+    """Entrée du cours dans le menu principal."""
+    nom_affiche = f"{job['nom_latin']} - {job['nom_arabe']}" if job["nom_arabe"] else job["channel_title"]
+    return f"◈ <a href='{channel_link_prefix}'>{nom_affiche}</a>"
+
+def chunk_lines(lines, header="", limit=MESSAGE_MAX_LENGTH, max_lines=MESSAGE_MAX_LINKS):
+    """
+    Répartit des lignes HTML en messages d'au plus `limit` unités UTF-16 et `max_lines`
+    lignes, l'en-tête en tête de chacun. La limite de longueur porte sur le texte une fois
+    le HTML analysé : les balises (ex. <a href=...>) ne comptent pas. Chaque ligne porte un
+    lien, et Telegram limite aussi le nombre d'entités par message.
+    """
+    prefix = header + "\n\n" if header else ""
+    prefix_size = utf16_len(visible_text(prefix))
+    blocks, current, size = [], [], prefix_size
+    for line in lines:
+        line_size = utf16_len(visible_text(line))
+        extra = line_size + (1 if current else 0)
+        if current and (size + extra > limit or len(current) >= max_lines):
+            blocks.append(prefix + "\n".join(current))
+            current, size = [], prefix_size
+            extra = line_size
+        current.append(line)
+        size += extra
+    if current:
+        blocks.append(prefix + "\n".join(current))
+    return blocks
+
+async def sync_blocks(client, entity, stored, texts, logger, pin=False):
+    """
+    Aligne les messages d'un menu sur `texts` : `stored` est la copie locale
+    [[msg_id, texte], ...] des messages déjà publiés. Seuls les blocs modifiés sont
+    édités, les blocs en plus sont envoyés (et épinglés si `pin`), ceux en trop supprimés.
+    Retourne la nouvelle copie locale ; un bloc en échec y garde son ancien contenu,
+    il sera repris à la prochaine synchronisation.
+    """
+    # Telethon n'est chargé qu'ici : la construction des menus (planificateur hors ligne) s'en passe
+    from telethon.errors import MessageNotModifiedError, MessageIdInvalidError
+
+    result = []
+    for idx, text in enumerate(texts):
+        old = stored[idx] if idx < len(stored) else None
+        if old and old[1] == text:
+            result.append(old)
+            continue
+        try:
+            if old:
+                try:
+                    await client.edit_message(entity, old[0], text, parse_mode="html", link_preview=False)
+                    logger.log(f"✏️ Bloc {idx + 1} du menu mis à jour.")
+                    result.append([old[0], text])
+                    continue
+                except MessageNotModifiedError:
+                    result.append([old[0], text])
+                    continue
+                except MessageIdInvalidError:
+                    # Message supprimé entre-temps : on le republie
+                    logger.log(f"ℹ️ Bloc {idx + 1} du menu introuvable, nouvel envoi.")
+            msg = await client.send_message(entity, text, parse_mode="html", link_preview=False)
+        except Exception as e:
+            logger.log(f"❌ Erreur mise à jour du bloc {idx + 1} du menu : {e}")
+            if not old:
+                return result
+            result.append(old)
+            continue
+        logger.log(f"📄 Bloc {idx + 1} du menu publié.")
+        result.append([msg.id, text])
+        if pin:
+            try:
+                await client.pin_message(entity, msg, notify=False)
+            except Exception as e:
+                logger.log(f"⚠️ Épinglage du menu impossible : {e}")
+    extra = [msg_id for msg_id, _ in stored[len(texts):]]
+    if extra:
+        try:
+            await client.delete_messages(entity, extra)
+        except Exception as e:
+            logger.log(f"⚠️ Suppression des anciens blocs du menu impossible : {e}")
+    return result
+
+# === Menu global du canal principal ===
+class MainMenu:
+    """
+    Menu principal des cours, tenu dans un ou plusieurs messages épinglés du canal de
+    menu et modifiés sur place. Une ligne par canal de cours ; la copie locale
+    (~/.telegram_sessions/main_menu.sqlite, par canal de menu) permet de n'éditer que
+    les blocs qui changent, sans relire l'historique du canal.
+    """
+
+    _locks = {}
+
+    def __init__(self, path=os.path.join(SESSIONS_DIR, "main_menu.sqlite")):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " menu_id INTEGER, entry_key TEXT, line TEXT, position INTEGER,"
+            " PRIMARY KEY (menu_id, entry_key))"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS blocks (menu_id INTEGER PRIMARY KEY, blocks TEXT)")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def lines(self, menu_id):
+        rows = self.conn.execute(
+            "SELECT line FROM entries WHERE menu_id = ? ORDER BY position", (menu_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_entry(self, menu_id, entry_key, line):
+        """Ajoute ou remplace la ligne d'un cours."""
+        row = self.conn.execute(
+            "SELECT line FROM entries WHERE menu_id = ? AND entry_key = ?", (menu_id, entry_key)
+        ).fetchone()
+        if row:
+            if row[0] == line:
+                return
+            self.conn.execute(
+                "UPDATE entries SET line = ? WHERE menu_id = ? AND entry_key = ?", (line, menu_id, entry_key)
+            )
+        else:
+            position = self.conn.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM entries WHERE menu_id = ?", (menu_id,)
+            ).fetchone()[0]
+            self.conn.execute(
+                "INSERT INTO entries (menu_id, entry_key, line, position) VALUES (?, ?, ?, ?)",
+                (menu_id, entry_key, line, position)
+            )
+        self.conn.commit()
+
+    def blocks(self, menu_id):
+        row = self.conn.execute("SELECT blocks FROM blocks WHERE menu_id = ?", (menu_id,)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def set_blocks(self, menu_id, blocks):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO blocks (menu_id, blocks) VALUES (?, ?)", (menu_id, json.dumps(blocks))
+        )
+        self.conn.commit()
+
+    @classmethod
+    async def update(cls, client, entity, menu_id, entry_key, line, logger):
+        """
+        Place `line` dans le menu du canal `menu_id` et répercute le changement sur les
+        messages épinglés. Retourne False si le menu était déjà à jour (aucun appel réseau).
+        """
+        lock = cls._locks.setdefault((asyncio.get_running_loop(), menu_id), asyncio.Lock())
+        async with lock:
+            menu = cls()
+            try:
+                menu.set_entry(menu_id, entry_key, line)
+                stored = menu.blocks(menu_id)
+                # Une entrée = un lien : bloc épinglé limité en liens comme en longueur
+                texts = chunk_lines(menu.lines(menu_id), max_lines=MESSAGE_MAX_LINKS)
+                if [text for _, text in stored] == texts:
+                    return False
+                menu.set_blocks(menu_id, await sync_blocks(client, entity, stored, texts, logger, pin=True))
+                return True
+            finally:
+                menu.close()
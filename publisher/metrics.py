@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import contextvars
+from contextlib import contextmanager
+
+from .settings import METRICS_DIR, PROMETHEUS_TEXTFILE_DIR
+from .course import normalize_name
+
+# Phase en cours dans la tâche asyncio courante (les tâches filles en héritent)
+_current_span = contextvars.ContextVar("publish_span", default=None)
+
+# Connexions récentes par compte, rattachées à la publication suivante de ce compte
+_pending_connects = {}
+
+class Span:
+    """Une phase chronométrée : durée, octets envoyés, nouvelles tentatives et FloodWait subis."""
+
+    def __init__(self, phase):
+        self.phase = phase
+        self.seconds = 0.0
+        self.bytes = 0
+        self.retries = 0
+        self.flood_waits = 0
+        self.flood_wait_seconds = 0
+
+@contextmanager
+def timed(span):
+    token = _current_span.set(span)
+    started = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span.seconds = time.perf_counter() - started
+        _current_span.reset(token)
+
+def note_retry():
+    """Appelé par le RateScheduler : nouvelle tentative dans la phase en cours."""
+    span = _current_span.get()
+    if span is not None:
+        span.retries += 1
+
+def note_flood(seconds):
+    """Appelé par le RateScheduler : FloodWait subi dans la phase en cours."""
+    span = _current_span.get()
+    if span is not None:
+        span.flood_waits += 1
+        span.flood_wait_seconds += seconds
+
+@contextmanager
+def connect_span(api_name):
+    """Chronomètre la connexion / autorisation d'un compte (rattachée à sa prochaine publication)."""
+    span = Span("connect")
+    with timed(span):
+        yield span
+    _pending_connects[api_name] = span
+
+# === Mesures d'une publication ===
+class PublishMetrics:
+    """
+    Phases chronométrées d'une publication (connexion, résolution des entités, création
+    du canal, chaque envoi d'image / d'audio, menus...). En fin de publication : résumé
+    JSON dans METRICS_DIR et, si textfile_dir est défini, fichier .prom pour le
+    collecteur textfile de node_exporter.
+    """
+
+    textfile_dir = PROMETHEUS_TEXTFILE_DIR
+
+    def __init__(self, api_name, book_name):
+        self.api_name = api_name
+        self.book_name = book_name
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.spans = []
+        self.summary = None
+        connect = _pending_connects.pop(api_name, None)
+        if connect is not None:
+            self.spans.append(connect)
+
+    @contextmanager
+    def span(self, phase):
+        span = Span(phase)
+        try:
+            with timed(span):
+                yield span
+        finally:
+            self.spans.append(span)
+
+    def phases(self):
+        phases = {}
+        for span in self.spans:
+            p = phases.setdefault(span.phase, {
+                "count": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0,
+                "retries": 0, "flood_waits": 0, "flood_wait_seconds": 0,
+            })
+            p["count"] += 1
+            p["seconds"] += span.seconds
+            p["max_seconds"] = max(p["max_seconds"], span.seconds)
+            p["bytes"] += span.bytes
+            p["retries"] += span.retries
+            p["flood_waits"] += span.flood_waits
+            p["flood_wait_seconds"] += span.flood_wait_seconds
+        for p in phases.values():
+            p["seconds"] = round(p["seconds"], 3)
+            p["max_seconds"] = round(p["max_seconds"], 3)
+        return phases
+
+    def finish(self, logger=None):
+        """Clôt la mesure (une seule fois), écrit les rapports et retourne le résumé."""
+        if self.summary is not None:
+            return self.summary
+        phases = self.phases()
+        self.summary = {
+            "account": self.api_name,
+            "book": self.book_name,
+            "started_at": round(self.started_at, 3),
+            "seconds": round(time.perf_counter() - self._started, 3),
+            "bytes": sum(p["bytes"] for p in phases.values()),
+            "retries": sum(p["retries"] for p in phases.values()),
+            "flood_waits": sum(p["flood_waits"] for p in phases.values()),
+            "flood_wait_seconds": sum(p["flood_wait_seconds"] for p in phases.values()),
+            "phases": phases,
+        }
+        try:
+            self.write_json()
+            if self.textfile_dir:
+                self.write_prometheus(self.textfile_dir)
+        except OSError as e:
+            if logger:
+                logger.log(f"⚠️ Écriture du rapport de performance impossible : {e}")
+        if logger:
+            logger.log(self.report())
+        return self.summary
+
+    def report(self):
+        parts = []
+        for phase, p in sorted(self.summary["phases"].items(), key=lambda item: -item[1]["seconds"]):
+            part = f"{phase} {p['seconds']:.1f} s"
+            if p["bytes"]:
+                part += f" ({p['bytes'] / (1024 * 1024):.1f} Mo)"
+            if p["flood_waits"]:
+                part += f" [{p['flood_waits']} FloodWait, {p['flood_wait_seconds']} s]"
+            parts.append(part)
+        return f"⏱️ Phases ({self.summary['seconds']:.1f} s) : " + ", ".join(parts)
+
+    def _basename(self):
+        return f"{normalize_name(self.api_name)}_{normalize_name(self.book_name)}"
+
+    def write_json(self, directory=METRICS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        path = os.path.join(directory, f"{self._basename()}_{stamp}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary, f, ensure_ascii=False, indent=2)
+        return path
+
+    def write_prometheus(self, directory):
+        """Fichier textfile node_exporter (remplacé atomiquement, un par compte et par cours)."""
+        def esc(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        base = f'account="{esc(self.api_name)}",book="{esc(self.book_name)}"'
+        series = [
+            ("telegram_publish_phase_seconds", "Durée cumulée de la phase lors de la dernière publication.", "seconds"),
+            ("telegram_publish_phase_max_seconds", "Durée maximale d'une occurrence de la phase.", "max_seconds"),
+            ("telegram_publish_phase_count", "Nombre d'occurrences de la phase.", "count"),
+            ("telegram_publish_phase_bytes", "Octets envoyés pendant la phase.", "bytes"),
+            ("telegram_publish_phase_retries", "Nouvelles tentatives pendant la phase.", "retries"),
+            ("telegram_publish_phase_flood_waits", "FloodWait subis pendant la phase.", "flood_waits"),
+            ("telegram_publish_phase_flood_wait_seconds", "Secondes d'attente FloodWait pendant la phase.",
+             "flood_wait_seconds"),
+        ]
+        lines = []
+        for name, help_text, field in series:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for phase, p in sorted(self.summary["phases"].items()):
+                lines.append(f'{name}{{{base},phase="{esc(phase)}"}} {p[field]}')
+        lines += [
+            "# HELP telegram_publish_duration_seconds Durée totale de la dernière publication.",
+            "# TYPE telegram_publish_duration_seconds gauge",
+            f"telegram_publish_duration_seconds{{{base}}} {self.summary['seconds']}",
+            "# HELP telegram_publish_last_run_timestamp_seconds Début de la dernière publication.",
+            "# TYPE telegram_publish_last_run_timestamp_seconds gauge",
+            f"telegram_publish_last_run_timestamp_seconds{{{base}}} {self.summary['started_at']}",
+        ]
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"telegram_publish_{self._basename()}.prom")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+        return path
@@ -0,0 +1,647 @@
+import os
+import re
+import asyncio
+from collections import deque
+from contextlib import nullcontext
+
+from telethon import TelegramClient
+from telethon.tl.functions.channels import CreateChannelRequest, GetFullChannelRequest, EditPhotoRequest
+from telethon.errors import ChannelInvalidError, ChannelPrivateError, UserAlreadyParticipantError
+from telethon.tl.functions.messages import ImportChatInviteRequest
+
+from .settings import SESSIONS_DIR, UPLOAD_CONCURRENCY, FLOOD_PRESSURE_THRESHOLD, ALBUM_SIZE, QUEUE_CHANNELS
+from .course import course_bytes, CourseIndex
+from .journal import PublishJournal
+from .media_cache import MediaCache
+from .entity_cache import EntityCache
+from .menus import (
+    MainMenu, chunk_lines, sync_blocks, lesson_menu_line, lesson_menu_intro, lesson_menu_back, lesson_menu_markers,
+    main_menu_line
+)
+from .scheduler import RateScheduler, ScheduledClient
+from .engine import UploadEngine
+from .uploader import ParallelUploader
+from .images import ImagePreprocessor
+from .audio import AudioIndex
+from .metrics import PublishMetrics, connect_span
+from .clone import clone_lessons
+from .reconcile import reconcile_lessons
+
+async def get_channel_entity(client, channel_link, logger):
+    """
+    Récupère l'entité Telegram d'un canal (public ou privé) de manière robuste.
+    - Si canal public → get_entity
+    - Si canal privé avec +code → get_entity si déjà membre/admin, sinon ImportChatInviteRequest
+    """
+    entity = None
+    try:
+        if not channel_link:
+            raise ValueError("Aucun lien fourni")
+
+        logger.log(f"🔗 Recherche du canal : {channel_link}")
+
+        # Extraire suffixe (username ou +code)
+        m = re.match(r"^https:\/\/t\.me\/(.+)$", channel_link)
+        suffix = m.group(1) if m else channel_link
+
+        if suffix.startswith("+"):
+            invite_code = suffix[1:]
+
+            # ✅ 1. Essayer directement get_entity (si déjà admin ou membre, ça marche)
+            try:
+                entity = await client.get_entity(suffix)
+                logger.log("✅ Canal privé trouvé via get_entity (déjà membre/admin).")
+            except Exception as e1:
+                logger.log(f"⚠️ get_entity a échoué pour lien privé : {e1}")
+
+                # ✅ 2. Si pas déjà participant → ImportChatInviteRequest
+                try:
+                    logger.log("🔑 Tentative d'import via code d'invitation...")
+                    result = await client(ImportChatInviteRequest(invite_code))
+                    entity = result.chats[0]
+                    logger.log("✅ Canal privé rejoint via ImportChatInviteRequest.")
+                except UserAlreadyParticipantError:
+                    logger.log("ℹ️ Déjà membre du canal privé, récupération via get_entity forcée.")
+                    entity = await client.get_entity(suffix)
+                except Exception as e2:
+                    logger.log(f"❌ Échec de l'import d'invitation privée : {e2}")
+                    entity = None
+        else:
+            # ✅ Canal public classique
+            entity = await client.get_entity(suffix)
+            logger.log("✅ Canal public trouvé via get_entity.")
+
+    except Exception as e:
+        logger.log(f"📢 Canal non trouvé ou lien invalide : {e}")
+        entity = None
+
+    return entity
+
+async def get_channel_link(client, entity):
+    """Lien public (https://t.me/username) ou interne (https://t.me/c/id) d'un canal."""
+    full = await client(GetFullChannelRequest(entity))
+    if full.chats[0].username:
+        return f"https://t.me/{full.chats[0].username}"
+    return f"https://t.me/c/{entity.id}"
+
+async def resolve_cached(client, cache, key, resolve, logger):
+    """
+    (entité, infos) pour `key` : depuis le cache des entités s'il est valide (aucun
+    aller-retour réseau), sinon via `resolve()` puis GetFullChannelRequest pour le lien.
+    infos = {id, access_hash, title, link} ; link vaut None s'il n'a pas pu être déterminé.
+    Retourne (None, None) si l'entité est introuvable.
+    """
+    info = cache.get(key)
+    if info:
+        logger.log(f"⚡ {info['title'] or key} : entité en cache.")
+        return EntityCache.input_peer(info), info
+    entity = await resolve()
+    if entity is None:
+        return None, None
+    try:
+        link = await get_channel_link(client, entity)
+    except Exception as e:
+        logger.log(f"⚠️ Erreur récupération lien du canal : {e}")
+        return entity, {"id": entity.id, "access_hash": entity.access_hash,
+                        "title": getattr(entity, "title", ""), "link": None}
+    return entity, cache.put(key, entity, link)
+
+async def publish_course(client, job, logger, api_name, concurrency=UPLOAD_CONCURRENCY, scheduler=None,
+                         progress=None):
+    """
+    Publie un cours (job construit par build_publish_job) avec un client déjà connecté
+    et autorisé : canal, leçons, menu des leçons, entrée dans le menu principal.
+    Avec job["clone_from"], les leçons déjà publiées dans ce canal source y sont copiées
+    par transferts groupés au lieu d'être ré-envoyées. Avec job["reconcile"], le journal
+    est d'abord reconstruit depuis l'historique du canal (seules les leçons absentes sont
+    envoyées, le menu est régénéré).
+    `progress(faites, total)` est appelé au fil des leçons publiées.
+    """
+    book_name = job["book_name"]
+    book_path = job["book_path"]
+    channel_title = job["channel_title"]
+    channel_link = job["channel_link"]
+    hashtag = job["hashtag"]
+    hashtag_nom = job["hashtag_nom"]
+    nom_arabe = job["nom_arabe"]
+    channel_photo_path = job["channel_photo_path"]
+
+    # Tous les appels passent par le planificateur de débit
+    if scheduler is None:
+        scheduler = RateScheduler(logger)
+    client = ScheduledClient(client, scheduler)
+
+    journal = None
+    media_cache = None
+    preprocessor = None
+    uploader = None
+    audio_index = None
+    entity_cache = EntityCache.for_account(api_name)
+    metrics = PublishMetrics(api_name, book_name)
+    try:
+        # === Récupérer le canal à partir de channel_link, sinon par son titre (ou le créer)
+        async def create_channel():
+            with metrics.span("create_channel"):
+                return await _create_channel()
+
+        async def _create_channel():
+            logger.log("📢 Création du canal en cours...")
+
+            about = f"{channel_title} - {nom_arabe}" if nom_arabe else channel_title
+
+            try:
+                result = await client(CreateChannelRequest(
+                    title=channel_title,
+                    about=about,
+                    megagroup=False
+                ))
+
+                created = result.chats[0]
+                logger.log(f"✅ Canal créé : {created.title}")
+
+                # Ajouter une photo au canal si elle a été sélectionnée
+                try:
+                    if channel_photo_path and os.path.exists(channel_photo_path):
+                        await client(EditPhotoRequest(
+                            channel=created,
+                            photo=await client.upload_file(channel_photo_path)
+                        ))
+                        logger.log("🖼️ Photo du canal définie avec succès.")
+                    else:
+                        logger.log("ℹ️ Aucune photo de canal sélectionnée.")
+                except Exception as e:
+                    logger.log(f"⚠️ Erreur ajout photo : {e}")
+
+
+                # Tenter de définir le username public
+                # try:
+                #     await client(UpdateUsernameRequest(
+                #         channel=created,
+                #         username=username
+                #     ))
+                #     logger.log(f"🔗 Lien du canal : https://t.me/{username}")
+                # except UsernameOccupiedError:
+                #     logger.log("⚠️ Ce nom d'utilisateur est déjà pris.")
+                # except Exception as e:
+                #     logger.log(f"⚠️ Impossible de définir le lien public : {e}")
+                return created
+            except Exception as e:
+                logger.log(f"❌ Erreur création canal : {e}")
+                return None
+
+        async def find_or_create_channel():
+            try:
+                found = await client.get_entity(channel_title)
+                logger.log(f"✅ Canal trouvé : {found.title}")
+                return found
+            except (ChannelInvalidError, ValueError):
+                return await create_channel()
+
+        with metrics.span("resolve"):
+            if channel_link:
+                entity, channel_info = await resolve_cached(
+                    client, entity_cache, f"link:{channel_link}",
+                    lambda: get_channel_entity(client, channel_link, logger), logger)
+            else:
+                entity, channel_info = await resolve_cached(
+                    client, entity_cache, f"title:{channel_title}", find_or_create_channel, logger)
+        if entity is None:
+            if channel_link:
+                # Si le lien est fourni mais l'entité n'est pas trouvée
+                logger.log("❌ Lien de canal invalide ou inaccessible.")
+            return
+
+        channel_id = channel_info["id"]
+        channel_link_prefix = channel_info["link"]
+        if channel_link_prefix is None:
+            channel_link_prefix = "https://t.me"
+        elif channel_link_prefix.startswith("https://t.me/c/"):
+            # Canal sans nom d'utilisateur → lien privé
+            logger.log(f"🔐 Canal sans username public. Lien interne : {channel_link_prefix}")
+        else:
+            logger.log(f"🔗 Lien du canal confirmé : {channel_link_prefix}")
+
+        # === Canal principal (menu global), résolu une seule fois
+        main_channel_id = job["main_channel_id"]
+        main_channel = {}
+
+        async def resolve_main_channel():
+            if not main_channel:
+                with metrics.span("resolve_main"):
+                    main_entity, main_info = await resolve_cached(
+                        client, entity_cache, f"main:{main_channel_id}",
+                        lambda: client.get_entity(main_channel_id), logger)
+                main_channel["entity"] = main_entity
+                main_channel["id"] = main_info["id"]
+                # Lien public ou interne du canal principal, sinon l'identifiant tel quel
+                main_channel["link"] = main_info["link"] or main_channel_id
+            return main_channel["entity"], main_channel["link"]
+
+        # === Publier les leçons
+        lessons = CourseIndex.get(book_path, logger).lessons
+
+        # === Journal : reprendre là où la dernière publication s'est arrêtée
+        journal = PublishJournal.for_course(api_name, book_name)
+        known_channel = journal.bind_channel(channel_id)
+        if not known_channel:
+            logger.log(f"📓 Nouveau journal de publication : {journal.path}")
+
+        # === Réconciliation : l'historique du canal fait foi (journal perdu, publications manuelles)
+        if job.get("reconcile"):
+            with metrics.span("reconcile"):
+                await reconcile_lessons(client, entity, lessons, hashtag, journal, logger,
+                                        full=job["reconcile"] == "full" or not known_channel,
+                                        menu_markers=lesson_menu_markers(hashtag_nom))
+        msg_ids = {}  # base_name -> id du message image
+        pending = []
+        for lesson in lessons:
+            row = journal.state(lesson)
+            if row and row["status"] == PublishJournal.SENT:
+                msg_ids[lesson["base_name"]] = row["msg_id"]
+            elif row and row["status"] == PublishJournal.IMAGE_SENT:
+                # Image déjà publiée : seul l'audio reste à envoyer
+                msg_ids[lesson["base_name"]] = row["msg_id"]
+                pending.append(dict(lesson, resume_msg_id=row["msg_id"]))
+            else:
+                pending.append(lesson)
+        if len(pending) < len(lessons):
+            logger.log(f"⏩ {len(lessons) - len(pending)} leçon(s) déjà publiée(s) d'après le journal, reprise.")
+
+        # === Mode clonage : copier les leçons d'un canal existant (aucun ré-upload)
+        if job.get("clone_from") and pending:
+            source = await get_channel_entity(client, job["clone_from"], logger)
+            if source is None:
+                logger.log("❌ Canal source introuvable : clonage impossible.")
+                return
+            if source.id == channel_id:
+                logger.log("❌ Le canal cible est le canal source : indiquez le lien du nouveau canal.")
+                return
+            with metrics.span("clone"):
+                pending = await clone_lessons(client, source, entity, pending, hashtag, journal, msg_ids, logger)
+
+        if progress:
+            progress(len(lessons) - len(pending), len(lessons))
+
+        # Les fichiers sont pré-envoyés en parallèle, les messages publiés dans l'ordre
+        media_cache = MediaCache.for_account(api_name)
+        if job.get("preprocess"):
+            if ImagePreprocessor.available():
+                # Toutes les images partent dans le pool dès maintenant, le moteur les consomme au fil de l'eau
+                preprocessor = ImagePreprocessor(logger=logger)
+                preprocessor.start([l["img_path"] for l in pending if not l.get("resume_msg_id")])
+                logger.log("🗜️ Optimisation des images en parallèle...")
+            else:
+                logger.log("⚠️ Pillow n'est pas installé : images envoyées sans optimisation.")
+        # Durée, titre et interprète des audios analysés dans un pool, pendant les envois
+        audio_paths = [l["audio_path"] for l in pending if l["audio_path"]]
+        if audio_paths:
+            audio_index = AudioIndex(logger=logger)
+            audio_index.start(audio_paths)
+        # Gros audios / vidéos : morceaux envoyés en parallèle sur des connexions dédiées
+        uploader = ParallelUploader(client.client, logger=logger)
+        engine = UploadEngine(client, concurrency, logger, media_cache, preprocessor, metrics, uploader,
+                              audio_index)
+        logger.log(f"🚀 Envoi des fichiers ({engine.concurrency} en parallèle)...")
+
+        # Mode album : les leçons image seule consécutives partent par albums de ALBUM_SIZE
+        album = []  # (leçon, fichier pré-envoyé) en attente
+
+        async def flush_album():
+            if not album:
+                return
+            items = album[:]
+            album.clear()
+            paths = [lesson["img_path"] for lesson, _ in items]
+            captions = [f"{hashtag} {lesson['base_name']}" for lesson, _ in items]
+            try:
+                file_hashes = [await asyncio.to_thread(PublishJournal.lesson_hash, lesson) for lesson, _ in items]
+                if len(items) == 1:
+                    msgs = [await engine.send(entity, paths[0], items[0][1], caption=captions[0])]
+                else:
+                    msgs = await engine.send_album(entity, paths, [f for _, f in items], captions)
+            except Exception as e:
+                if isinstance(e, (ChannelInvalidError, ChannelPrivateError)):
+                    entity_cache.invalidate_id(channel_id)
+                for lesson, _ in items:
+                    journal.record(lesson, PublishJournal.FAILED, error=str(e))
+                    logger.log(f"❌ Erreur envoi {lesson['img_name']} : {e}")
+                return
+            for (lesson, _), msg, file_hash in zip(items, msgs, file_hashes):
+                journal.record(lesson, PublishJournal.SENT, msg.id, file_hash=file_hash)
+                msg_ids[lesson["base_name"]] = msg.id
+                engine.lesson_done()
+            logger.log(f"   ✅ Album de {len(items)} image(s) envoyé. (pas d'audio)")
+
+        i = len(lessons) - len(pending)
+        async for lesson, (img_file, audio_file), error in engine.stream(pending):
+            i += 1
+            img_name = lesson["img_name"]
+            base_name = lesson["base_name"]
+            logger.log(f"🖼️ Publication de {base_name} ({i}/{len(lessons)})...")
+            if progress:
+                progress(i - 1, len(lessons))
+
+            if job["albums"] and not error and img_file and not audio_file:
+                album.append((lesson, img_file))
+                if len(album) == ALBUM_SIZE:
+                    await flush_album()
+                continue
+            await flush_album()
+
+            caption = f"{hashtag} {base_name}"
+
+            msg_id = lesson.get("resume_msg_id")  # image déjà publiée lors d'un envoi précédent
+            file_hash = None
+            try:
+                if error:
+                    raise error
+                file_hash = await asyncio.to_thread(PublishJournal.lesson_hash, lesson)
+                if img_file:
+                    msg = await engine.send(entity, lesson["img_path"], img_file, caption=caption)
+                    msg_id = msg.id
+                if audio_file:
+                    journal.record(lesson, PublishJournal.IMAGE_SENT, msg_id, file_hash=file_hash)
+                    audio_msg = await engine.send(entity, lesson["audio_path"], audio_file)
+                    journal.record(lesson, PublishJournal.SENT, msg_id, audio_msg.id, file_hash=file_hash)
+                    logger.log("   ✅ Image + audio envoyés.")
+                else:
+                    journal.record(lesson, PublishJournal.SENT, msg_id, file_hash=file_hash)
+                    logger.log("   ✅ Image envoyée. (pas d'audio)")
+                engine.lesson_done()
+                msg_ids[base_name] = msg_id
+            except Exception as e:
+                if msg_id is not None:
+                    # Image publiée, audio en échec : la reprise n'enverra que l'audio
+                    journal.record(lesson, PublishJournal.IMAGE_SENT, msg_id, file_hash=file_hash)
+                    msg_ids[base_name] = msg_id
+                elif base_name not in msg_ids:
+                    journal.record(lesson, PublishJournal.FAILED, error=str(e))
+                if isinstance(e, (ChannelInvalidError, ChannelPrivateError)):
+                    # Canal supprimé ou inaccessible : l'entité en cache n'est plus valable
+                    entity_cache.invalidate_id(channel_id)
+                logger.log(f"❌ Erreur envoi {img_name} : {e}")
+        await flush_album()
+        if progress:
+            progress(len(msg_ids), len(lessons))
+
+        logger.log(engine.report())
+        if preprocessor:
+            logger.log(preprocessor.report())
+        logger.log(scheduler.report())
+        logger.log("✅ Tous les médias ont été publiés.")
+
+        # === Construire les liens du menu (leçons publiées maintenant ou lors d'un envoi précédent)
+        menu_links = [  # pour stocker les liens cliquables
+            lesson_menu_line(channel_link_prefix, msg_ids[lesson["base_name"]], hashtag_nom, lesson["base_name"])
+            for lesson in lessons if lesson["base_name"] in msg_ids
+        ]
+
+        # === Publier le menu : blocs découpés selon leur longueur réelle, modifiés sur place
+        menu_texts = chunk_lines(menu_links, lesson_menu_intro(hashtag_nom))
+        menu_blocks = journal.get_meta("menu_blocks")
+        if menu_blocks is None and menu_links and journal.get_meta("menu_links") == menu_links:
+            # Menu publié par une version précédente (ids des messages inconnus)
+            menu_blocks = []
+            menu_texts = []
+            logger.log("ℹ️ Menu des leçons déjà publié et inchangé (journal).")
+
+        if menu_texts:
+            # === Lien "Retour au Programme Principal", toujours en dernier message
+            if main_channel_id:
+                try:
+                    _, main_channel_link = await resolve_main_channel()
+                    menu_texts.append(lesson_menu_back(main_channel_link))
+                except Exception as e:
+                    logger.log(f"⚠️ Impossible d’ajouter le bouton retour : {e}")
+
+            menu_blocks = menu_blocks or []
+            if [text for _, text in menu_blocks] == menu_texts:
+                logger.log("ℹ️ Menu des leçons déjà publié et inchangé (journal).")
+            else:
+                logger.log("🗂️ Publication du menu des leçons...")
+                # Seuls les blocs modifiés sont édités, les nouveaux ajoutés à la suite
+                with metrics.span("menu"):
+                    menu_blocks = await sync_blocks(client, entity, menu_blocks, menu_texts, logger)
+                journal.set_meta("menu_blocks", menu_blocks)
+                journal.set_meta("menu_links", menu_links)
+                if [text for _, text in menu_blocks] == menu_texts:
+                    logger.log("✅ Menu des leçons à jour.")
+
+        # === Ajouter ce canal au Menu global du canal principal (messages épinglés modifiés sur place)
+        try:
+            if not main_channel_id:
+                logger.log("ℹ️ Aucun canal de menu principal spécifié.")
+            else:
+                logger.log(f"🧭 Connexion au canal de menu : {main_channel_id}")
+                main_entity, _ = await resolve_main_channel()
+
+                # Ligne HTML simple, une par canal de cours
+                menu_message = main_menu_line(job, channel_link_prefix)
+
+                with metrics.span("main_menu"):
+                    updated = await MainMenu.update(
+                        client, main_entity, main_channel["id"], str(channel_id), menu_message, logger)
+                if updated:
+                    logger.log("📌 Menu principal mis à jour.")
+                else:
+                    logger.log("ℹ️ Canal déjà présent dans le menu principal.")
+        except (ChannelInvalidError, ChannelPrivateError) as e:
+            entity_cache.invalidate(f"main:{main_channel_id}")
+            logger.log(f"⚠️ Erreur ajout lien dans canal principal : {e}")
+        except Exception as e:
+            logger.log(f"⚠️ Erreur ajout lien dans canal principal : {e}")
+
+        return dict(engine.stats(), book=book_name, total_lessons=len(lessons), published=len(msg_ids),
+                    metrics=metrics.finish(logger))
+    finally:
+        # Rapport écrit aussi en cas d'arrêt prématuré ou d'erreur
+        metrics.finish(logger)
+        entity_cache.close()
+        if journal:
+            journal.close()
+        if media_cache:
+            media_cache.close()
+        if preprocessor:
+            preprocessor.shutdown()
+        if uploader:
+            await uploader.close()
+        if audio_index:
+            audio_index.close()
+
+class PrefixedLogger:
+    """Préfixe chaque ligne de log (ex. nom du compte en publication multi-comptes)."""
+
+    def __init__(self, logger, prefix):
+        self.logger = logger
+        self.prefix = prefix
+
+    def log(self, text):
+        self.logger.log(f"{self.prefix}{text}")
+
+async def connect_authorized_accounts(api_keys, logger):
+    """Connecte chaque clé API dont la session (~/.telegram_sessions) est déjà autorisée."""
+    accounts = []
+    for key in api_keys:
+        session_path = os.path.join(SESSIONS_DIR, f"session_{key['name']}.session")
+        if not os.path.exists(session_path):
+            logger.log(f"ℹ️ [{key['name']}] Aucune session, compte ignoré.")
+            continue
+        client = TelegramClient(session_path, key['api_id'], key['api_hash'])
+        try:
+            with connect_span(key['name']):
+                await client.connect()
+                authorized = await client.is_user_authorized()
+            if authorized:
+                accounts.append((key, client))
+                continue
+            logger.log(f"ℹ️ [{key['name']}] Session non autorisée, compte ignoré.")
+        except Exception as e:
+            logger.log(f"⚠️ [{key['name']}] Connexion impossible : {e}")
+        await client.disconnect()
+    return accounts
+
+def journal_owner(account_names, book_name):
+    """Compte dont le journal de ce cours est le plus récent, ou None si aucun ne l'a publié."""
+    journals = [(os.path.getmtime(path), name) for name in account_names
+                for path in [PublishJournal.path_for(name, book_name)] if os.path.exists(path)]
+    return max(journals)[1] if journals else None
+
+async def publish_catalogue(api_keys, jobs, logger, concurrency=UPLOAD_CONCURRENCY, service=None):
+    """
+    Répartit une file de cours entre tous les comptes autorisés, un cours par compte à la fois.
+    Les plus gros cours partent en premier ; un compte sous pression FloodWait prend
+    les plus petits restants, pour équilibrer les octets et les attentes entre comptes.
+    Un cours déjà publié (même en partie) par un compte lui revient toujours : son journal
+    et ses caches (canal, médias) sont propres au compte, un autre compte recréerait le
+    canal et renverrait tous les fichiers.
+    Avec un ClientService, ses clients (déjà connectés) et planificateurs sont réutilisés.
+    Retourne None si aucun compte n'est autorisé (rien n'a pu être publié).
+    """
+    if service:
+        accounts = await service.authorized_accounts(api_keys)
+    else:
+        accounts = await connect_authorized_accounts(api_keys, logger)
+    if not accounts:
+        logger.log("❌ Aucun compte autorisé pour la publication multi-comptes.")
+        return None
+    logger.log(f"👥 {len(accounts)} compte(s) pour {len(jobs)} cours.")
+
+    sizes = {job["book_name"]: course_bytes(job["book_path"]) for job in jobs}
+    queue = deque()  # cours jamais publiés : pris par le premier compte libre
+    owned = {key['name']: deque() for key, _ in accounts}  # cours rattachés à leur compte d'origine
+    for job in sorted(jobs, key=lambda job: sizes[job["book_name"]], reverse=True):
+        owner = journal_owner(owned, job["book_name"])
+        (owned[owner] if owner else queue).append(job)
+    sticky = sum(len(q) for q in owned.values())
+    if sticky:
+        logger.log(f"📌 {sticky} cours déjà commencé(s) confié(s) au compte qui les a publiés (journal).")
+    results = []
+
+    async def run_account(key, client):
+        account_logger = PrefixedLogger(logger, f"[{key['name']}] ")
+        scheduler = service.scheduler_for(key['name']) if service else RateScheduler(account_logger)
+        mine = owned[key['name']]
+        while mine or queue:
+            source = mine or queue
+            job = source.pop() if scheduler.pressure() > FLOOD_PRESSURE_THRESHOLD else source.popleft()
+            size = sizes[job["book_name"]]
+            account_logger.log(f"📚 {job['book_name']} ({size / (1024 * 1024):.1f} Mo)")
+            try:
+                with service.in_use(key['name']) if service else nullcontext():
+                    summary = await publish_course(client, job, account_logger, key['name'], concurrency,
+                                                   scheduler)
+            except Exception as e:
+                account_logger.log(f"❌ Erreur publication {job['book_name']} : {e}")
+                summary = None
+            results.append({"book": job["book_name"], "account": key['name'], "bytes": size,
+                            "ok": summary is not None, "summary": summary})
+
+    try:
+        await asyncio.gather(*(run_account(key, client) for key, client in accounts))
+    finally:
+        if not service:
+            for _, client in accounts:
+                await client.disconnect()
+
+    for key, _ in accounts:
+        done = [r for r in results if r["account"] == key['name']]
+        total = sum(r["bytes"] for r in done)
+        logger.log(f"📊 [{key['name']}] {len(done)} cours, {total / (1024 * 1024):.1f} Mo")
+    return results
+
+async def publish_queue(client, jobs, logger, api_name, parallel=1, concurrency=UPLOAD_CONCURRENCY):
+    """
+    Publie une file de cours avec un seul compte, `parallel` cours à la fois.
+    Les cours partagent le même planificateur de débit (limites du compte).
+    """
+    scheduler = RateScheduler(logger)
+    queue = deque(jobs)
+    results = []
+
+    async def run_slot(slot):
+        slot_logger = PrefixedLogger(logger, f"[{slot}] ") if parallel > 1 else logger
+        while queue:
+            job = queue.popleft()
+            slot_logger.log(f"📚 {job['book_name']}")
+            try:
+                summary = await publish_course(client, job, slot_logger, api_name, concurrency, scheduler)
+            except Exception as e:
+                slot_logger.log(f"❌ Erreur publication {job['book_name']} : {e}")
+                summary = None
+            results.append({"book": job["book_name"], "account": api_name, "bytes": course_bytes(job["book_path"]),
+                            "ok": summary is not None, "summary": summary})
+
+    await asyncio.gather(*(run_slot(slot) for slot in range(1, max(1, parallel) + 1)))
+    logger.log(scheduler.report())
+    return results
+
+async def run_job_queue(queue, service, api_keys, logger, channels=QUEUE_CHANNELS, concurrency=UPLOAD_CONCURRENCY,
+                        authorize=None):
+    """
+    Exécute la file persistante (JobQueue) : `channels` cours publiés à la fois, toujours
+    le job en attente le plus prioritaire d'abord, avec le client et le planificateur de
+    débit du compte de chaque job (ClientService). Les jobs ajoutés pendant l'exécution
+    sont pris en compte ; la file s'arrête quand il n'y a plus rien en attente.
+    `authorize(client)` est transmis à ClientService.get_client (session non autorisée).
+    """
+    keys = {key['name']: key for key in api_keys}
+    results = []
+
+    async def run_slot(slot):
+        while True:
+            item = queue.claim()
+            if item is None:
+                return
+            job, account = item["job"], item["account"]
+            slot_logger = PrefixedLogger(logger, f"[{account}] ")
+            slot_logger.log(f"📚 File : {job['book_name']} (priorité {item['priority']})")
+            try:
+                if account not in keys:
+                    raise ValueError(f"Clé API '{account}' introuvable.")
+                with service.in_use(account):
+                    client = await service.get_client(keys[account], authorize)
+                    summary = await publish_course(
+                        client, job, slot_logger, account, concurrency, service.scheduler_for(account),
+                        progress=lambda done, total, job_id=item["id"]: queue.progress(job_id, done, total)
+                    )
+                if summary is None:
+                    # Arrêt prévu par publish_course (lien invalide, source introuvable...) : à retenter
+                    slot_logger.log(f"❌ Publication de {job['book_name']} interrompue.")
+                    queue.finish(item["id"], "Publication interrompue (voir le journal des opérations).")
+                else:
+                    queue.finish(item["id"])
+            except Exception as e:
+                slot_logger.log(f"❌ Erreur publication {job['book_name']} : {e}")
+                queue.finish(item["id"], e)
+                summary = None
+            results.append({"book": job["book_name"], "account": account, "ok": summary is not None,
+                            "summary": summary})
+
+    # Jobs ajoutés pendant que les derniers cours se terminaient : repris sans attendre un nouveau lancement
+    while True:
+        await asyncio.gather(*(run_slot(slot) for slot in range(max(1, channels))))
+        if not queue.pending_count():
+            break
+    failed = sum(1 for r in results if not r["ok"])
+    logger.log(f"📋 File terminée : {len(results) - failed} cours publié(s), {failed} en échec.")
+    return results
@@ -0,0 +1,201 @@
+import os
+import re
+import json
+import glob
+
+from .settings import METRICS_DIR, RATE_LIMITS, ALBUM_SIZE, DEFAULT_UPLOAD_BYTES_PER_S
+from .course import extraire_numero, CourseIndex
+from .journal import PublishJournal
+from .menus import chunk_lines, lesson_menu_line, lesson_menu_intro, main_menu_line
+
+# Lien le plus long possible d'un message (canal privé), pour dimensionner les blocs du menu
+PLACEHOLDER_LINK = "https://t.me/c/0000000000"
+PLACEHOLDER_MSG_ID = 99999
+
+def measured_throughput(api_name=None, limit=20):
+    """
+    Débit observé lors des publications précédentes (rapports de PublishMetrics) :
+    (octets / s, secondes par message publié, nombre de rapports utilisés), ou None.
+    Les rapports du compte sont préférés s'il y en a.
+    """
+    reports = []
+    for path in sorted(glob.glob(os.path.join(METRICS_DIR, "*.json")), key=os.path.getmtime, reverse=True):
+        try:
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if report.get("bytes", 0) >= 1024 * 1024:  # les petits envois faussent le débit
+            reports.append(report)
+    if api_name and any(r.get("account") == api_name for r in reports):
+        reports = [r for r in reports if r.get("account") == api_name]
+    reports = reports[:limit]
+    if not reports:
+        return None
+    seconds = sum(r["seconds"] - r["phases"].get("connect", {}).get("seconds", 0) for r in reports)
+    sends = [r["phases"]["send"] for r in reports if "send" in r["phases"]]
+    per_message = sum(p["seconds"] for p in sends) / max(1, sum(p["count"] for p in sends)) if sends else None
+    return sum(r["bytes"] for r in reports) / max(seconds, 0.001), per_message, len(reports)
+
+def find_anomalies(index, lessons):
+    """Audios manquants ou orphelins, numéros en double, manquants ou dans le désordre."""
+    anomalies = []
+    with_audio = sum(1 for l in lessons if l["audio_path"])
+    if with_audio:
+        missing = [l["base_name"] for l in lessons if not l["audio_path"]]
+        if missing:
+            anomalies.append(f"{len(missing)} leçon(s) sans audio : {', '.join(missing[:20])}")
+    if os.path.isdir(index.audios_dir):
+        images = {l["base_name"] for l in lessons}
+        orphans = sorted(
+            os.path.splitext(entry.name)[0] for entry in os.scandir(index.audios_dir)
+            if entry.name.endswith(".mp3") and os.path.splitext(entry.name)[0] not in images
+        )
+        if orphans:
+            anomalies.append(f"{len(orphans)} audio(s) sans image : {', '.join(orphans[:20])}")
+
+    numbers = []
+    for lesson in lessons:
+        num = extraire_numero(lesson["base_name"])
+        if num == lesson["base_name"] and not re.fullmatch(r"\d+(?:_\d+)*", num):
+            anomalies.append(f"Leçon sans numéro : {lesson['base_name']}")
+            continue
+        numbers.append((int(num.split("_")[0]), lesson["base_name"]))
+    seen = {}
+    for n, name in numbers:
+        if n in seen:
+            anomalies.append(f"Numéro {n} en double : {seen[n]}, {name}")
+        seen.setdefault(n, name)
+    if seen:
+        gaps = [n for n in range(min(seen), max(seen) + 1) if n not in seen]
+        if gaps:
+            anomalies.append(f"{len(gaps)} numéro(s) manquant(s) : {', '.join(map(str, gaps[:20]))}")
+    order = [n for n, _ in numbers]
+    if order != sorted(order):
+        anomalies.append("Ordre des fichiers différent de la numérotation (zéros de tête manquants ?)")
+    return anomalies
+
+def build_plan(job, api_name=None, concurrency=None):
+    """
+    Plan de publication complet, construit hors ligne (aucun appel Telegram) : leçons dans
+    l'ordre d'envoi avec légendes et numéros, messages, blocs du menu, entrée du menu
+    principal, octets par type de média, anomalies et durée estimée.
+    """
+    index = CourseIndex.get(job["book_path"])
+    lessons = index.lessons
+
+    # Leçons déjà publiées d'après le journal (lu seulement s'il existe)
+    done = {}
+    if api_name and os.path.exists(PublishJournal.path_for(api_name, job["book_name"])):
+        journal = PublishJournal.for_course(api_name, job["book_name"])
+        try:
+            for lesson in lessons:
+                row = journal.state(lesson)
+                if row and row["status"] in (PublishJournal.SENT, PublishJournal.IMAGE_SENT):
+                    done[lesson["base_name"]] = row["status"]
+        finally:
+            journal.close()
+
+    planned = []
+    image_bytes = audio_bytes = 0
+    messages = 0
+    album = 0
+    for lesson in lessons:
+        status = done.get(lesson["base_name"])
+        send_image = status is None
+        send_audio = bool(lesson["audio_path"]) and status != PublishJournal.SENT
+        if send_image:
+            image_bytes += lesson["img_size"]
+            if job.get("albums") and not lesson["audio_path"]:
+                # Images seules consécutives : un envoi par album de ALBUM_SIZE
+                album = album + 1 if album < ALBUM_SIZE else 1
+                messages += album == 1
+            else:
+                album = 0
+                messages += 1
+        if send_audio:
+            audio_bytes += lesson["audio_size"]
+            messages += 1
+        planned.append({
+            "base_name": lesson["base_name"],
+            "number": extraire_numero(lesson["base_name"]),
+            "caption": f"{job['hashtag']} {lesson['base_name']}",
+            "image": lesson["img_name"],
+            "image_bytes": lesson["img_size"],
+            "audio": os.path.basename(lesson["audio_path"]) if lesson["audio_path"] else None,
+            "audio_bytes": lesson["audio_size"],
+            "status": "published" if status == PublishJournal.SENT else "audio_pending" if status else "pending",
+        })
+
+    menu_lines = [
+        lesson_menu_line(job["channel_link"] or PLACEHOLDER_LINK, PLACEHOLDER_MSG_ID, job["hashtag_nom"], l["base_name"])
+        for l in lessons
+    ]
+    menu_blocks = chunk_lines(menu_lines, lesson_menu_intro(job["hashtag_nom"]))
+    main_entry = main_menu_line(job, job["channel_link"] or PLACEHOLDER_LINK) if job["main_channel_id"] else None
+
+    # Durée : les envois de fichiers et la publication des messages se recouvrent (pipeline)
+    upload_bytes = image_bytes + audio_bytes
+    throughput = measured_throughput(api_name)
+    if throughput:
+        bytes_per_s, per_message, runs = throughput
+        basis = f"débit mesuré sur {runs} publication(s)"
+    else:
+        bytes_per_s, per_message, runs = DEFAULT_UPLOAD_BYTES_PER_S, None, 0
+        basis = "débit par défaut (aucune publication mesurée)"
+    send_interval = max(per_message or 0, 1 / RATE_LIMITS["send"])
+    total_messages = messages + len(menu_blocks) + bool(job["main_channel_id"]) * 2
+    estimate = max(upload_bytes / bytes_per_s, total_messages * send_interval)
+
+    return {
+        "book": job["book_name"],
+        "channel_title": job["channel_title"],
+        "channel_link": job["channel_link"],
+        "lessons": planned,
+        "total_lessons": len(lessons),
+        "already_published": sum(1 for s in done.values() if s == PublishJournal.SENT),
+        "images": {"count": sum(1 for p in planned if p["status"] == "pending"), "bytes": image_bytes},
+        "audios": {"count": sum(1 for p in planned if p["audio"] and p["status"] != "published"), "bytes": audio_bytes},
+        "messages": messages,
+        "menu_blocks": menu_blocks,
+        "main_menu_entry": main_entry,
+        "anomalies": find_anomalies(index, lessons),
+        "estimate": {
+            "seconds": round(estimate),
+            "bytes_per_s": round(bytes_per_s),
+            "seconds_per_message": round(send_interval, 3),
+            "basis": basis,
+            "concurrency": concurrency,
+        },
+    }
+
+def format_duration(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours} h {rest // 60:02d} min" if hours else f"{rest // 60} min {rest % 60:02d} s"
+
+def format_plan(plan, details=True):
+    """Plan lisible, ligne par ligne (journal de l'interface ou terminal)."""
+    mb = 1024 * 1024
+    lines = [
+        f"📋 Plan de publication (simulation) : {plan['book']} → « {plan['channel_title']} »",
+        f"   {plan['total_lessons']} leçon(s), {plan['already_published']} déjà publiée(s) d'après le journal",
+        f"   Images : {plan['images']['count']} ({plan['images']['bytes'] / mb:.1f} Mo) — "
+        f"audios : {plan['audios']['count']} ({plan['audios']['bytes'] / mb:.1f} Mo)",
+        f"   {plan['messages']} envoi(s) de médias, menu en {len(plan['menu_blocks'])} bloc(s)",
+    ]
+    if plan["main_menu_entry"]:
+        lines.append(f"   Entrée du menu principal : {plan['main_menu_entry']}")
+    estimate = plan["estimate"]
+    lines.append(f"⏱️ Durée estimée : ~{format_duration(estimate['seconds'])} "
+                 f"({estimate['bytes_per_s'] / mb:.2f} Mo/s, {estimate['basis']})")
+    if details:
+        for lesson in plan["lessons"]:
+            audio = f" + {lesson['audio']} ({lesson['audio_bytes'] / mb:.1f} Mo)" if lesson["audio"] else " (pas d'audio)"
+            mark = {"published": "✅", "audio_pending": "🔁"}.get(lesson["status"], "  ")
+            lines.append(f"   {mark} n° {lesson['number']:<6} « {lesson['caption']} » "
+                         f"{lesson['image']} ({lesson['image_bytes'] / mb:.1f} Mo){audio}")
+    for anomaly in plan["anomalies"]:
+        lines.append(f"⚠️ {anomaly}")
+    if not plan["anomalies"]:
+        lines.append("✅ Aucune anomalie détectée.")
+    return lines
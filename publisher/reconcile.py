@@ -0,0 +1,58 @@
+import asyncio
+
+from .journal import PublishJournal
+from .clone import scan_lessons
+
+HISTORY_MIN_ID = "history_min_id"  # clé du journal : historique du canal déjà lu jusqu'à cet id
+
+async def reconcile_lessons(client, entity, lessons, hashtag, journal, logger, full=False, menu_markers=()):
+    """
+    Reconstruit le journal d'un cours à partir de l'historique de son canal : chaque
+    image légendée « hashtag base_name » (et l'audio qui la suit) y est enregistrée
+    comme publiée, avec l'id de ses messages. L'historique est lu par pages de 100
+    messages, à partir de l'id où s'est arrêtée la lecture précédente.
+    Avec `full` (ou un journal neuf), tout l'historique est relu et fait foi : les
+    leçons du journal introuvables dans le canal en sont retirées, pour être republiées,
+    et les messages du menu trouvés (d'après `menu_markers`) deviennent les blocs du
+    menu : ils seront édités ou supprimés au lieu qu'un second menu soit publié.
+    Retourne {base_name: [id image, id audio ou None]} des leçons trouvées.
+    """
+    min_id = 0 if full else journal.get_meta(HISTORY_MIN_ID, 0)
+    by_name = {l["base_name"]: l for l in lessons}
+    if min_id:
+        logger.log(f"🔁 Réconciliation avec le canal (messages après #{min_id})...")
+    else:
+        logger.log("🔁 Réconciliation avec le canal (historique complet)...")
+    menus = None if min_id else []
+    found = await scan_lessons(client, entity, hashtag, set(by_name), min_id=min_id, menus=menus,
+                               menu_markers=menu_markers)
+
+    complete = partial = 0
+    resume_id = max([min_id] + [i for ids in found.values() for i in ids if i])
+    for base_name, (image_id, audio_id) in found.items():
+        lesson = by_name[base_name]
+        file_hash = await asyncio.to_thread(PublishJournal.lesson_hash, lesson)
+        if lesson["audio_path"] and audio_id is None:
+            journal.record(lesson, PublishJournal.IMAGE_SENT, image_id, file_hash=file_hash)
+            # Son audio peut encore être publié à la suite : la prochaine lecture repart de l'image
+            resume_id = min(resume_id, image_id - 1)
+            partial += 1
+        else:
+            journal.record(lesson, PublishJournal.SENT, image_id, audio_id, file_hash=file_hash)
+            complete += 1
+
+    forgotten = set()
+    if not min_id:
+        forgotten = journal.sent_names() - set(found)
+        journal.forget(forgotten)
+        # Le canal fait foi pour le menu aussi ; le texte HTML connu du journal est gardé
+        # (le texte lu est sans balises : un bloc inconnu sera donc réédité)
+        known = {msg_id: text for msg_id, text in journal.get_meta("menu_blocks") or []}
+        journal.set_meta("menu_blocks", [[msg_id, known.get(msg_id, text)] for msg_id, text in menus])
+        if menus:
+            logger.log(f"🗂️ {len(menus)} message(s) du menu retrouvé(s) dans le canal : mis à jour sur place.")
+    journal.set_meta(HISTORY_MIN_ID, resume_id)
+
+    logger.log(f"✅ Réconciliation : {complete} leçon(s) présente(s) dans le canal, {partial} sans audio"
+               + (f", {len(forgotten)} absente(s) retirée(s) du journal" if forgotten else "") + ".")
+    return found
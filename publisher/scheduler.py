@@ -0,0 +1,176 @@
+import asyncio
+import random
+import time
+from collections import deque
+
+from telethon.errors import FloodWaitError, SlowModeWaitError, ServerError, RpcCallFailError
+
+from .settings import RATE_LIMITS, MAX_RETRIES, MAX_FLOOD_WAIT, FLOOD_PRESSURE_WINDOW
+from .metrics import note_flood, note_retry
+
+# === Planificateur de débit commun à tous les appels Telegram ===
+class TokenBucket:
+    """Seau à jetons dont le débit s'adapte aux FloodWait (diminution multiplicative, remontée progressive)."""
+
+    def __init__(self, rate):
+        self.max_rate = rate
+        self.min_rate = rate / 20
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_flood(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate * 0.02)
+
+class RateScheduler:
+    """
+    Point de passage unique des appels Telegram : un seau à jetons par classe d'appels,
+    respect des délais FloodWait imposés par le serveur, nouvelles tentatives avec
+    attente exponentielle sur les erreurs serveur/réseau. Une coupure réseau n'est
+    retentée que pour les appels idempotents : un envoi a pu atteindre le serveur
+    avant la coupure, le refaire publierait la leçon en double.
+    """
+
+    RETRYABLE = (ServerError, RpcCallFailError)
+    NETWORK_ERRORS = (ConnectionError, asyncio.TimeoutError)
+
+    def __init__(self, logger=None, limits=None, max_retries=MAX_RETRIES, max_flood_wait=MAX_FLOOD_WAIT):
+        self.logger = logger
+        self.limits = dict(RATE_LIMITS, **(limits or {}))
+        self.max_retries = max_retries
+        self.max_flood_wait = max_flood_wait
+        self.buckets = {}
+        self.flood_waits = 0
+        self.flood_wait_seconds = 0
+        self.flood_events = deque()  # (instant, secondes) des FloodWait récents
+        self.retries = 0
+
+    def bucket(self, kind):
+        if kind not in self.buckets:
+            self.buckets[kind] = TokenBucket(self.limits.get(kind, self.limits["default"]))
+        return self.buckets[kind]
+
+    def _log(self, text):
+        if self.logger:
+            self.logger.log(text)
+
+    async def call(self, kind, func, *args, idempotent=True, **kwargs):
+        bucket = self.bucket(kind)
+        retryable = self.RETRYABLE + self.NETWORK_ERRORS if idempotent else self.RETRYABLE
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            try:
+                result = await func(*args, **kwargs)
+            except (FloodWaitError, SlowModeWaitError) as e:
+                if e.seconds > self.max_flood_wait:
+                    raise
+                self.flood_waits += 1
+                self.flood_wait_seconds += e.seconds
+                self.flood_events.append((time.monotonic(), e.seconds))
+                note_flood(e.seconds)
+                bucket.on_flood(e.seconds)
+                self._log(f"⏳ FloodWait ({kind}) : attente de {e.seconds} s, débit réduit à {bucket.rate:.2f}/s.")
+                continue
+            except retryable as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                self.retries += 1
+                note_retry()
+                delay = min(60, 2 ** attempt) + random.uniform(0, 1)
+                self._log(f"🔁 Erreur temporaire ({kind}) : {e} — nouvelle tentative dans {delay:.1f} s.")
+                await asyncio.sleep(delay)
+                continue
+            bucket.on_success()
+            return result
+
+    def pressure(self):
+        """
+        Pression FloodWait du compte, en secondes : attente restante (toutes classes
+        confondues) plus les attentes subies sur la fenêtre récente.
+        """
+        now = time.monotonic()
+        while self.flood_events and now - self.flood_events[0][0] > FLOOD_PRESSURE_WINDOW:
+            self.flood_events.popleft()
+        remaining = max([b.blocked_until - now for b in self.buckets.values()] + [0])
+        return remaining + sum(seconds for _, seconds in self.flood_events)
+
+    def report(self):
+        rates = ", ".join(f"{k} {b.rate:.2f}/s" for k, b in self.buckets.items())
+        return (f"🚦 Planificateur : {self.flood_waits} FloodWait ({self.flood_wait_seconds} s), "
+                f"{self.retries} nouvelle(s) tentative(s) — débits : {rates}")
+
+class ScheduledClient:
+    """
+    Enveloppe un TelegramClient : les méthodes réseau et les requêtes TL passent par le
+    RateScheduler, le reste (connect, sign_in, disconnect...) est transmis tel quel.
+    """
+
+    METHOD_CLASSES = {
+        "upload_file": "upload",
+        "send_file": "send",
+        "send_message": "send",
+        "edit_message": "send",
+        "forward_messages": "send",
+        "pin_message": "send",
+        "delete_messages": "send",
+        "get_entity": "resolve",
+        "get_input_entity": "resolve",
+        "get_messages": "read",
+    }
+    # Appels qui créent quelque chose côté serveur : pas de nouvel essai après une coupure réseau
+    NOT_IDEMPOTENT = {"send_file", "send_message", "forward_messages", "CreateChannelRequest"}
+    REQUEST_CLASSES = {
+        "CreateChannelRequest": "channel",
+        "EditPhotoRequest": "channel",
+        "UpdateUsernameRequest": "channel",
+        "GetFullChannelRequest": "resolve",
+        "UploadMediaRequest": "upload",
+        "ImportChatInviteRequest": "resolve",
+    }
+
+    def __init__(self, client, scheduler):
+        self.client = client
+        self.scheduler = scheduler
+        # Tous les FloodWait remontent au planificateur (pas de mise en veille interne de Telethon)
+        client.flood_sleep_threshold = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        kind = self.METHOD_CLASSES.get(name)
+        if kind is None:
+            return attr
+
+        async def scheduled(*args, **kwargs):
+            return await self.scheduler.call(kind, attr, *args, idempotent=name not in self.NOT_IDEMPOTENT,
+                                             **kwargs)
+        return scheduled
+
+    async def __call__(self, request, *args, **kwargs):
+        name = type(request).__name__
+        kind = self.REQUEST_CLASSES.get(name, "default")
+        return await self.scheduler.call(kind, self.client, request, *args,
+                                         idempotent=name not in self.NOT_IDEMPOTENT, **kwargs)
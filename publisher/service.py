@@ -0,0 +1,168 @@
+import os
+import asyncio
+import threading
+from contextlib import contextmanager
+
+from .settings import SESSIONS_DIR, CLIENT_HEALTH_INTERVAL
+from .metrics import connect_span
+
+class ClientService:
+    """
+    Service Telegram de longue durée : une boucle asyncio dans un thread dédié et un
+    client connecté par clé API, réutilisés d'une publication à l'autre (pas de
+    nouvelle poignée de main ni de caches Telethon perdus à chaque clic).
+    Les tâches (publication, menus...) lui sont soumises avec submit() ; une
+    vérification périodique reconnecte les clients tombés, sans toucher à ceux qui
+    publient (leurs erreurs sont gérées par le planificateur de débit). Telethon n'est chargé
+    qu'au premier client créé : le service ne ralentit pas le démarrage de l'interface.
+    """
+
+    def __init__(self, logger=None, health_interval=CLIENT_HEALTH_INTERVAL):
+        self.logger = logger
+        self.health_interval = health_interval
+        self.loop = None
+        self.thread = None
+        self.clients = {}     # nom de la clé -> TelegramClient connecté
+        self.schedulers = {}  # nom de la clé -> RateScheduler (débit appris conservé)
+        self._locks = {}
+        self._busy = {}       # nom de la clé -> tâches en cours avec ce client
+        self._ready = threading.Event()
+
+    def _log(self, text):
+        if self.logger:
+            self.logger.log(text)
+
+    # --- Cycle de vie
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return self
+        self._ready.clear()
+        self.thread = threading.Thread(target=self._run, name="telegram-client-service", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        health = self.loop.create_task(self._health_loop())
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            health.cancel()
+            self.loop.run_until_complete(asyncio.gather(health, return_exceptions=True))
+            self.loop.close()
+
+    def stop(self, timeout=10):
+        if not self.thread or not self.thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._disconnect_all(), self.loop).result(timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+
+    async def _disconnect_all(self):
+        for client in self.clients.values():
+            await client.disconnect()
+        self.clients.clear()
+
+    # --- Clients
+    def scheduler_for(self, name):
+        if name not in self.schedulers:
+            from .scheduler import RateScheduler
+            self.schedulers[name] = RateScheduler(self.logger)
+        return self.schedulers[name]
+
+    async def get_client(self, key, authorize=None):
+        """
+        Client connecté et autorisé pour cette clé API. `authorize(client)` est appelé
+        (coroutine) si la session n'est pas encore autorisée ; sans lui, erreur.
+        """
+        name = key['name']
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            client = self.clients.get(name)
+            if client is not None and client.is_connected():
+                return client
+            if client is None:
+                from telethon import TelegramClient
+                session_path = os.path.join(SESSIONS_DIR, f"session_{name}.session")
+                os.makedirs(os.path.dirname(session_path), exist_ok=True)
+                client = TelegramClient(session_path, key['api_id'], key['api_hash'])
+            # Connexion chronométrée, rattachée à la prochaine publication de ce compte
+            with connect_span(name):
+                await client.connect()
+                if not await client.is_user_authorized():
+                    if authorize is None or not await authorize(client) or not await client.is_user_authorized():
+                        raise PermissionError(f"Session '{name}' non autorisée.")
+            self.clients[name] = client
+            return client
+
+    async def authorized_accounts(self, api_keys):
+        """(clé, client) pour chaque clé dont la session existante est déjà autorisée."""
+        accounts = []
+        for key in api_keys:
+            if key['name'] not in self.clients and not os.path.exists(
+                    os.path.join(SESSIONS_DIR, f"session_{key['name']}.session")):
+                continue
+            try:
+                accounts.append((key, await self.get_client(key)))
+            except Exception as e:
+                self._log(f"ℹ️ [{key['name']}] Compte ignoré : {e}")
+        return accounts
+
+    @contextmanager
+    def in_use(self, name):
+        """Client occupé par une tâche : la vérification périodique ne le touche pas."""
+        self._busy[name] = self._busy.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            self._busy[name] -= 1
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for name, client in list(self.clients.items()):
+                if self._busy.get(name):
+                    continue
+                from telethon.errors import FloodWaitError
+                try:
+                    if not client.is_connected():
+                        self._log(f"🔌 [{name}] Connexion perdue, reconnexion...")
+                        await client.connect()
+                        continue
+                    await client.get_me()
+                except FloodWaitError:
+                    pass  # compte limité, mais connexion en bon état
+                except ConnectionError as e:
+                    self._log(f"⚠️ [{name}] Connexion défaillante ({e}), reconnexion...")
+                    try:
+                        await client.disconnect()
+                        await client.connect()
+                    except Exception:
+                        pass
+                except Exception as e:
+                    self._log(f"⚠️ [{name}] Vérification de connexion échouée : {e}")
+
+    # --- Tâches
+    def submit(self, key, fn, *args, authorize=None, **kwargs):
+        """
+        Exécute `fn(client, *args, **kwargs)` (coroutine) dans la boucle du service avec
+        le client de cette clé. Retourne un concurrent.futures.Future.
+        """
+        self.start()
+
+        async def job():
+            with self.in_use(key['name']):
+                client = await self.get_client(key, authorize)
+                return await fn(client, *args, **kwargs)
+        return asyncio.run_coroutine_threadsafe(job(), self.loop)
+
+    def run(self, coro_fn, *args, **kwargs):
+        """Exécute une coroutine quelconque dans la boucle du service (ex. publication multi-comptes)."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro_fn(*args, **kwargs), self.loop)
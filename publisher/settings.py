@@ -0,0 +1,95 @@
+import os
+import json
+from pathlib import Path
+
+# === Chemin du fichier de configuration des clés API ===
+API_KEYS_FILE = os.path.join(os.path.expanduser("~"), ".api_keys.json")
+
+# === Dossier des sessions Telegram (et des journaux de publication) ===
+SESSIONS_DIR = os.path.join(Path.home(), ".telegram_sessions")
+
+# === Chargement des clés API ===
+def load_api_keys():
+    if os.path.exists(API_KEYS_FILE):
+        with open(API_KEYS_FILE, "r") as f:
+            return json.load(f)
+    return []
+
+def save_api_keys(keys):
+    with open(API_KEYS_FILE, "w") as f:
+        json.dump(keys, f, indent=2)
+
+# === Service client : intervalle de vérification des connexions (secondes) ===
+CLIENT_HEALTH_INTERVAL = 60
+
+# === Nombre d'envois de fichiers simultanés par défaut ===
+UPLOAD_CONCURRENCY = 4
+
+# === Optimisation des images avant envoi (optionnelle, nécessite Pillow) ===
+IMAGE_MAX_SIDE = 2560                  # dimension maximale des photos Telegram
+IMAGE_JPEG_QUALITY = 85
+PNG_TO_JPEG_MIN_BYTES = 512 * 1024     # PNG plus lourds convertis en JPEG
+IMAGE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "telegram_course_publisher", "images")
+
+# === Index des métadonnées audio (durée, débit, titre, interprète) ===
+AUDIO_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "telegram_course_publisher", "audio_index.sqlite")
+
+# === Mode album : nombre maximal d'images par album Telegram ===
+ALBUM_SIZE = 10
+
+# === Débit maximal par classe d'appels Telegram (requêtes / seconde) ===
+RATE_LIMITS = {
+    "upload": 10.0,    # upload_file
+    "send": 1.0,       # messages et médias publiés
+    "channel": 0.2,    # création / modification de canal
+    "resolve": 2.0,    # résolution d'entités, infos de canal
+    "read": 2.0,       # lecture de messages
+    "default": 1.0,
+}
+MAX_RETRIES = 5            # nouvelles tentatives sur erreur serveur / réseau
+MAX_FLOOD_WAIT = 3600      # au-delà (secondes), un FloodWait est remonté à l'appelant
+
+# === Publication multi-comptes : pression FloodWait (secondes) au-delà de laquelle
+# un compte prend les plus petits cours restants plutôt que les plus gros ===
+FLOOD_PRESSURE_THRESHOLD = 60
+FLOOD_PRESSURE_WINDOW = 600
+
+# === Cache des médias déjà envoyés (politique d'éviction) ===
+MEDIA_CACHE_MAX_ENTRIES = 5000
+MEDIA_CACHE_MAX_AGE_DAYS = 90
+
+# === Cache des entités et liens de canaux résolus (durée de validité, secondes) ===
+ENTITY_CACHE_TTL = 7 * 24 * 3600
+
+# === Longueur maximale d'un message Telegram (unités UTF-16) ===
+MESSAGE_MAX_LENGTH = 4096
+
+# === Liens par message de menu (Telegram refuse au-delà d'une centaine d'entités) ===
+MESSAGE_MAX_LINKS = 99
+
+# === Journaux structurés (JSONL) des sessions ===
+LOG_DIR = os.path.join(os.path.expanduser("~"), ".cache", "telegram_course_publisher", "logs")
+
+# === Mesures de performance des publications ===
+METRICS_DIR = os.path.join(os.path.expanduser("~"), ".cache", "telegram_course_publisher", "metrics")
+PROMETHEUS_TEXTFILE_DIR = None   # ex. "/var/lib/node_exporter/textfile_collector" pour l'export Prometheus
+
+# === Simulation : débit supposé en l'absence de publication mesurée (octets / seconde) ===
+DEFAULT_UPLOAD_BYTES_PER_S = 1024 * 1024
+
+# === Envoi parallèle des gros fichiers (audio, vidéo) ===
+PARALLEL_UPLOAD_MIN_BYTES = 10 * 1024 * 1024   # au-delà, morceaux envoyés sur plusieurs connexions
+UPLOAD_CONNECTIONS = 4                         # connexions supplémentaires au DC du compte
+UPLOAD_PART_SIZE = 512 * 1024                  # taille des morceaux (max. Telegram : 512 Ko)
+
+# === Mode clonage : messages transférés par appel (maximum Telegram : 100) ===
+FORWARD_BATCH_SIZE = 100
+
+# === File de publication : nombre de cours (canaux) publiés simultanément ===
+QUEUE_CHANNELS = 2
+
+# === Surveillance des cours (nouvelles leçons publiées automatiquement, secondes) ===
+WATCH_DEBOUNCE = 30            # calme requis après le dernier changement (copie terminée)
+WATCH_PAIR_TIMEOUT = 15 * 60   # attente maximale de l'audio d'une nouvelle image
+WATCH_POLL_INTERVAL = 10       # scrutation des dossiers si inotify n'est pas disponible
+WATCH_RETRY_DELAY = 300        # nouvel essai après une publication en échec
@@ -0,0 +1,147 @@
+import os
+import mmap
+import random
+import asyncio
+
+from telethon import helpers
+from telethon.errors import FloodWaitError, ServerError, RpcCallFailError
+from telethon.network import MTProtoSender
+from telethon.tl.functions.upload import SaveBigFilePartRequest
+from telethon.tl.types import InputFileBig
+
+from .settings import (
+    PARALLEL_UPLOAD_MIN_BYTES, UPLOAD_CONNECTIONS, UPLOAD_PART_SIZE, MAX_RETRIES, MAX_FLOOD_WAIT
+)
+from .metrics import note_flood, note_retry
+
+BIG_FILE_MIN_BYTES = 10 * 1024 * 1024  # en dessous, Telegram n'accepte pas SaveBigFilePartRequest
+
+# === Envoi des gros fichiers par morceaux, sur plusieurs connexions ===
+class ParallelUploader:
+    """
+    Envoie les gros fichiers (audios longs, vidéos) en plusieurs morceaux simultanés,
+    répartis sur des connexions supplémentaires au DC du compte (même clé
+    d'autorisation), au lieu d'un morceau après l'autre sur une seule connexion.
+    Le fichier est lu via mmap : chaque morceau est pris directement dans la
+    projection du fichier, sans tampon de lecture intermédiaire.
+    Les connexions sont ouvertes au premier gros fichier et partagées par tous les
+    envois en cours ; si elles ne peuvent pas l'être, les morceaux passent en
+    parallèle par la connexion principale.
+    """
+
+    def __init__(self, client, connections=UPLOAD_CONNECTIONS, part_size=UPLOAD_PART_SIZE,
+                 min_bytes=PARALLEL_UPLOAD_MIN_BYTES, logger=None):
+        if part_size % 1024 or part_size > 512 * 1024 or (512 * 1024) % part_size:
+            raise ValueError("La taille des morceaux doit diviser 512 Ko (multiple de 1 Ko).")
+        self.client = client
+        self.connections = max(1, int(connections))
+        self.part_size = part_size
+        self.min_bytes = max(min_bytes, BIG_FILE_MIN_BYTES)
+        self.logger = logger
+        self._senders = []
+        self._pool = None  # file des fonctions d'envoi disponibles (une par connexion)
+        self._lock = asyncio.Lock()
+
+    def _log(self, text):
+        if self.logger:
+            self.logger.log(text)
+
+    def wants(self, size):
+        return size > self.min_bytes
+
+    async def _connect_sender(self):
+        client = self.client
+        sender = MTProtoSender(client.session.auth_key, loggers=client._log)
+        await sender.connect(client._connection(
+            client.session.server_address,
+            client.session.port,
+            client.session.dc_id,
+            loggers=client._log,
+            proxy=client._proxy,
+            local_addr=client._local_addr
+        ))
+        return sender
+
+    async def _open(self):
+        async with self._lock:
+            if self._pool is not None:
+                return
+            self._pool = asyncio.Queue()
+            for _ in range(self.connections):
+                try:
+                    sender = await self._connect_sender()
+                except Exception as e:
+                    self._log(f"⚠️ Connexion d'envoi supplémentaire impossible ({e}) : connexion principale utilisée.")
+                    break
+                self._senders.append(sender)
+                self._pool.put_nowait(sender.send)
+            if not self._senders:
+                for _ in range(self.connections):
+                    self._pool.put_nowait(self.client)
+            else:
+                self._log(f"🔀 {len(self._senders)} connexion(s) d'envoi ouvertes pour les gros fichiers.")
+
+    async def _send_part(self, request):
+        attempt = 0
+        while True:
+            send = await self._pool.get()
+            try:
+                result = await send(request)
+                error = None
+            except (FloodWaitError, ServerError, RpcCallFailError, ConnectionError, asyncio.TimeoutError) as e:
+                error = e
+            finally:
+                self._pool.put_nowait(send)
+            if error is None:
+                if not result:
+                    raise RuntimeError(f"Échec de l'envoi du morceau {request.file_part}.")
+                return
+            if isinstance(error, FloodWaitError):
+                if error.seconds > MAX_FLOOD_WAIT:
+                    raise error
+                note_flood(error.seconds)
+                self._log(f"⏳ FloodWait (morceaux) : attente de {error.seconds} s.")
+                await asyncio.sleep(error.seconds)
+                continue
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                raise error
+            note_retry()
+            await asyncio.sleep(min(60, 2 ** attempt) + random.uniform(0, 1))
+
+    async def upload(self, path):
+        """Envoie le fichier et retourne l'InputFileBig à passer à send_file."""
+        await self._open()
+        size = os.path.getsize(path)
+        file_id = helpers.generate_random_long()
+        parts = (size + self.part_size - 1) // self.part_size
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            indexes = iter(range(parts))
+
+            async def worker():
+                # Chaque tâche prend le prochain morceau à envoyer
+                for index in indexes:
+                    start = index * self.part_size
+                    await self._send_part(SaveBigFilePartRequest(
+                        file_id, index, parts, mm[start:start + self.part_size]
+                    ))
+
+            tasks = [asyncio.ensure_future(worker()) for _ in range(min(self.connections, parts))]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # Plus aucune tâche ne doit lire la projection une fois fermée
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        return InputFileBig(file_id, parts, os.path.basename(path))
+
+    async def close(self):
+        for sender in self._senders:
+            try:
+                await sender.disconnect()
+            except Exception:
+                pass
+        self._senders = []
+        self._pool = None
@@ -0,0 +1,272 @@
+import os
+import sys
+import time
+import struct
+import asyncio
+import ctypes
+import ctypes.util
+
+from .settings import (
+    WATCH_DEBOUNCE, WATCH_PAIR_TIMEOUT, WATCH_POLL_INTERVAL, WATCH_RETRY_DELAY, UPLOAD_CONCURRENCY
+)
+from .course import CourseIndex
+from .journal import PublishJournal
+from .scheduler import RateScheduler
+from .pipeline import publish_course
+
+# Événements inotify suivis (voir inotify(7))
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+def load_inotify():
+    """libc avec inotify (Linux), sinon None : la surveillance passe alors en scrutation."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch") else None
+
+# === Surveillance des dossiers images/ et audios/ des cours ===
+class CourseWatcher:
+    """
+    Signale les cours dont les fichiers ont changé, une fois le dossier resté calme
+    pendant `debounce` secondes (copie terminée). Utilise inotify quand il est
+    disponible, sinon compare périodiquement nom, taille et date des fichiers.
+    """
+
+    def __init__(self, book_paths, logger=None, debounce=WATCH_DEBOUNCE, poll_interval=WATCH_POLL_INTERVAL):
+        self.book_paths = list(book_paths)
+        self.logger = logger
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._due = {}         # chemin du cours -> instant où l'examiner
+        self._wakeup = asyncio.Event()
+        self._libc = None
+        self._fd = None
+        self._watches = {}     # descripteur de surveillance -> chemin du cours
+        self._signatures = {}  # chemin du cours -> état des fichiers (scrutation)
+        self._poller = None
+
+    def _log(self, text):
+        if self.logger:
+            self.logger.log(text)
+
+    @property
+    def mode(self):
+        return "inotify" if self._fd is not None else "scrutation"
+
+    # --- Cycle de vie
+    def start(self):
+        self._libc = load_inotify()
+        if self._libc:
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+                for path in self.book_paths:
+                    self._add_watches(path)
+                asyncio.get_running_loop().add_reader(fd, self._read_events)
+        if self._fd is None:
+            self._signatures = {path: self._signature(path) for path in self.book_paths}
+            self._poller = asyncio.ensure_future(self._poll())
+        self._log(f"👀 Surveillance de {len(self.book_paths)} cours ({self.mode}).")
+        return self
+
+    def stop(self):
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        if self._poller:
+            self._poller.cancel()
+            self._poller = None
+
+    # --- Événements
+    def touch(self, path):
+        """Changement dans le cours : examen repoussé à la fin de la période de calme."""
+        self._due[path] = time.monotonic() + self.debounce
+        self._wakeup.set()
+
+    def recheck(self, path, delay):
+        """Réexaminer le cours plus tard (ex. audio attendu), sauf si un examen est déjà prévu."""
+        self._due.setdefault(path, time.monotonic() + delay)
+        self._wakeup.set()
+
+    async def wait(self):
+        """Attend et retourne les cours à examiner (restés calmes depuis leur dernier changement)."""
+        while True:
+            now = time.monotonic()
+            ready = [path for path, due in self._due.items() if due <= now]
+            if ready:
+                for path in ready:
+                    del self._due[path]
+                return ready
+            self._wakeup.clear()
+            timeout = min(self._due.values()) - now if self._due else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # --- inotify
+    def _add_watches(self, path):
+        # Le dossier du cours est suivi aussi, pour voir apparaître images/ ou audios/
+        for directory in (path, os.path.join(path, "images"), os.path.join(path, "audios")):
+            if os.path.isdir(directory):
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+                if wd >= 0:
+                    self._watches[wd] = path
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        touched = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                touched.update(self.book_paths)
+            elif wd in self._watches:
+                touched.add(self._watches[wd])
+        for path in touched:
+            self._add_watches(path)  # nouveaux sous-dossiers éventuels
+            self.touch(path)
+
+    # --- Scrutation
+    @staticmethod
+    def _signature(path):
+        signature = []
+        for sub in ("images", "audios"):
+            directory = os.path.join(path, sub)
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                signature.append((sub, entry.name, st.st_size, st.st_mtime_ns))
+        return frozenset(signature)
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for path in self.book_paths:
+                signature = await asyncio.to_thread(self._signature, path)
+                if signature != self._signatures.get(path):
+                    self._signatures[path] = signature
+                    self.touch(path)
+
+def has_channel(job, api_name):
+    """Le cours a-t-il déjà un canal d'après le journal du compte (publication ou réconciliation) ?"""
+    if not os.path.exists(PublishJournal.path_for(api_name, job["book_name"])):
+        return False
+    journal = PublishJournal.for_course(api_name, job["book_name"])
+    try:
+        return journal.get_meta("channel_id") is not None
+    finally:
+        journal.close()
+
+def new_lessons(job, api_name):
+    """Leçons du cours pas encore entièrement publiées d'après le journal du compte (aucune sans journal)."""
+    if not os.path.exists(PublishJournal.path_for(api_name, job["book_name"])):
+        return []
+    lessons = CourseIndex.get(job["book_path"]).lessons
+    journal = PublishJournal.for_course(api_name, job["book_name"])
+    try:
+        return [l for l in lessons if (journal.state(l) or {}).get("status") != PublishJournal.SENT]
+    finally:
+        journal.close()
+
+async def watch_courses(client, jobs, logger, api_name, concurrency=UPLOAD_CONCURRENCY, scheduler=None,
+                        debounce=WATCH_DEBOUNCE, pair_timeout=WATCH_PAIR_TIMEOUT,
+                        poll_interval=WATCH_POLL_INTERVAL, stop=None):
+    """
+    Surveillance de longue durée : les nouvelles leçons déposées dans les cours sont
+    publiées dans leur canal existant, et le menu mis à jour, dès que les fichiers sont
+    complets. Une image sans son audio (dans un cours qui en a) attend l'audio jusqu'à
+    `pair_timeout` secondes. Seules les leçons absentes du journal sont envoyées et
+    seuls les blocs modifiés du menu sont édités : le coût suit le nombre de nouveaux
+    fichiers. Les cours sans journal lié à un canal sont ignorés : il faut d'abord les
+    publier ou les réconcilier, sinon tout le cours serait renvoyé (voire un canal créé).
+    S'arrête quand l'événement `stop` est levé.
+    """
+    scheduler = scheduler or RateScheduler(logger)
+    courses = {}
+    for job in jobs:
+        if await asyncio.to_thread(has_channel, job, api_name):
+            courses[job["book_path"]] = job
+        else:
+            logger.log(f"⏭️ {job['book_name']} : aucun canal connu pour ce compte, cours non surveillé "
+                       f"(publiez-le ou réconciliez-le d'abord avec --reconcile).")
+    if not courses:
+        logger.log("❌ Aucun cours à surveiller.")
+        return None
+    first_seen = {path: {} for path in courses}  # leçon incomplète -> première détection
+    results = []
+
+    async def publish(job):
+        logger.log(f"📚 {job['book_name']} : publication des nouvelles leçons...")
+        try:
+            summary = await publish_course(client, job, logger, api_name, concurrency, scheduler)
+        except Exception as e:
+            logger.log(f"❌ Erreur publication {job['book_name']} : {e}")
+            summary = None
+        results.append({"book": job["book_name"], "account": api_name, "ok": summary is not None,
+                        "summary": summary})
+        return summary is not None
+
+    watcher = CourseWatcher(courses, logger, debounce, poll_interval).start()
+    stop_task = asyncio.ensure_future(stop.wait()) if stop else None
+    try:
+        # Rattrapage : leçons ajoutées pendant que la surveillance était arrêtée
+        for path in courses:
+            watcher.recheck(path, 0)
+        while True:
+            wait_task = asyncio.ensure_future(watcher.wait())
+            done, _ = await asyncio.wait([t for t in (wait_task, stop_task) if t],
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if wait_task not in done:
+                wait_task.cancel()
+                break
+            for path in wait_task.result():
+                job = courses[path]
+                lessons = await asyncio.to_thread(new_lessons, job, api_name)
+                if not lessons:
+                    first_seen[path].clear()
+                    continue
+
+                # Paires incomplètes : attendre l'audio, dans la limite de pair_timeout
+                uses_audio = any(l["audio_path"] for l in CourseIndex.get(path).lessons)
+                now = time.monotonic()
+                waiting = []
+                for lesson in lessons:
+                    if uses_audio and not lesson["audio_path"]:
+                        seen = first_seen[path].setdefault(lesson["base_name"], now)
+                        if now - seen < pair_timeout:
+                            waiting.append((lesson["base_name"], seen + pair_timeout - now))
+                if waiting:
+                    names = ", ".join(name for name, _ in waiting[:10])
+                    logger.log(f"⏳ {job['book_name']} : audio attendu pour {names}")
+                    watcher.recheck(path, min(delay for _, delay in waiting))
+                    continue
+                logger.log(f"🆕 {job['book_name']} : {len(lessons)} leçon(s) à publier.")
+                if not await publish(job):
+                    watcher.recheck(path, WATCH_RETRY_DELAY)
+                first_seen[path].clear()
+    finally:
+        watcher.stop()
+        if stop_task:
+            stop_task.cancel()
+    return results